@@ -33,6 +33,8 @@
         - rapidwright [-rpd]: Flag to use Rapidwright implementation of design querying
         - out_file [-of]: Path of output file. Default is <bit_list_name>_fault_report.txt
         - pickle [-p]: Write fault report data as a .pickle file
+        - query_cache [-qc]: Path of a file to save Vivado design lookups to and reuse them from
+                             on later runs of the same design
 
     Returns:
         - output file (.txt) that reports the location and cause of any determinable fault bits
@@ -44,7 +46,7 @@ from io import TextIOWrapper
 from tqdm import tqdm
 from textwrap import wrap
 
-from lib.tile import Tile
+from lib.tile import Tile, get_tile_type
 from lib.file_processing import parse_tilegrid, parse_fault_bits, parse_design_bits
 from lib.design_query import VivadoQuery
 from lib.fault_analysis import FaultBit, analyze_bit_group
@@ -62,8 +64,7 @@ def get_tile_type_name(tile:str):
             Returns: String of the tile's type
     '''
 
-    end_index = tile.find('_X')
-    return tile[:end_index]
+    return get_tile_type(tile)
 
 def gen_tile_images(tilegrid:dict, part:str):
     '''
@@ -136,15 +137,8 @@ def gen_tcl_cmds(bit:FaultBit, outfile:TextIOWrapper):
             net_list_str = bit.failure.split(':')[1]
             msg_nets.extend(net_list_str.strip().split(', '))
 
-        # Identify all unconnected node placeholders from message
-        uc_nets = set()
-        for msg_net in msg_nets:
-            if 'Unconnected Wire' in msg_net:
-                uc_nets.add(msg_net)
-
         # Remove all unconnected node placeholders from message nets
-        for uc_net in uc_nets:
-            msg_nets.remove(uc_net)
+        msg_nets = [msg_net for msg_net in msg_nets if 'Unconnected Wire' not in msg_net]
 
         if msg_nets:
             msg_nets_str = ' '.join(sorted(msg_nets))
@@ -292,41 +286,34 @@ def print_bit_group_section(section_name:str, section_bits, outfile:TextIOWrappe
                 outfile.write(f'\t{sb.failure}\n')
             outfile.write('\n')
 
-def print_fault_report(outfile:str, fault_report:dict):
+def print_bit_group(bit_group:str, group_bits:dict, outfile:TextIOWrapper):
     '''
-        Prints the fault_report passed in to the output text file designated by the user.
-            Arguments: String of the outfile path and dict of the design's fault report
-            Return: Statistics object of total statistic values for the design
+        Prints the information for a single bit group in the fault report
+            Arguments: String of the bit group's name, dict of the group's fault bits, and the
+                       open output file to write to
+            Returns: Statistics object of the bit group's statistic values (None if the group
+                     has no fault bits)
     '''
 
-    statistics = Statistics()
-
-    # Open the output file to write to
-    with open(outfile, 'w') as out_f:
-
-        heavy_divider = '=' * 70
+    # Only print fault bit information if there are still fault bits in the bit group
+    if not group_bits:
+        return None
 
-        # Iterate through significant fault bits of each bit group and print out its information
-        for bit_group, group_bits in fault_report.items():
-            # Only print fault bit information if there are still fault bits in the bit group
-            if group_bits:
-                out_f.write(f'{heavy_divider}\n')
-                title_center_offset = ' ' * 29
-                out_f.write(f'{title_center_offset}Bit Group {bit_group}\n')
-                out_f.write(f'{heavy_divider}\n\n')
+    heavy_divider = '=' * 70
+    outfile.write(f'{heavy_divider}\n')
+    title_center_offset = ' ' * 29
+    outfile.write(f'{title_center_offset}Bit Group {bit_group}\n')
+    outfile.write(f'{heavy_divider}\n\n')
 
-                failure_bits, nonfailure_bits, undefined_bits = classify_fault_bits(group_bits)
+    failure_bits, nonfailure_bits, undefined_bits = classify_fault_bits(group_bits)
 
-                # Print summary of each section
-                print_bit_group_section('Failure Bits', failure_bits, out_f)
-                print_bit_group_section('Non-Failure Bits', nonfailure_bits, out_f)
-                print_bit_group_section('Undefined Bits', undefined_bits, out_f)
-
-                # Calculate and print group stats, and update total stats
-                group_stats = get_bit_group_stats(group_bits, True, out_f)
-                statistics.update(group_stats.stats)
+    # Print summary of each section
+    print_bit_group_section('Failure Bits', failure_bits, outfile)
+    print_bit_group_section('Non-Failure Bits', nonfailure_bits, outfile)
+    print_bit_group_section('Undefined Bits', undefined_bits, outfile)
 
-    return statistics
+    # Calculate and print group stats
+    return get_bit_group_stats(group_bits, True, outfile)
 
 def pickle_fault_report(report_name:str, fault_report:dict):
     '''
@@ -358,11 +345,12 @@ def main(args):
     t_start = time.perf_counter()
 
     # Parse in all high bits from the bitstream or from a .bits file [base_frame, word, bit]
+    # and store them in a set for constant time lookups during fault analysis
     print('Reading in Design Bits...')
     if args.bits_file:
-        design_bits = parse_design_bits(args.bitstream)
+        design_bits = set(parse_design_bits(args.bitstream))
     else:
-        design_bits = get_high_bits(args.bitstream)
+        design_bits = set(get_high_bits(args.bitstream))
 
     # Create a design query to get design info from the dcp file
     print('Generating Design Query...')
@@ -370,13 +358,13 @@ def main(args):
         from lib.rpd_query import RpdQuery
         design = RpdQuery(args.dcp_file)
     else:
-        design = VivadoQuery(args.dcp_file)
+        design = VivadoQuery(args.dcp_file, args.query_cache)
 
     # Parse in the corresponding part's tilegrid.json file
     print('Parsing in Input Files...')
     tilegrid = parse_tilegrid(design.part)
-    # Parse in a frame list for the part
-    frame_list = [frame[0] for frame in get_frame_list(design.part)]
+    # Parse in a set of the valid frames for the part
+    frame_list = {frame[0] for frame in get_frame_list(design.part)}
     # Parse in the fault bit information
     bit_groups = parse_fault_bits(args.fault_bits)
 
@@ -388,15 +376,22 @@ def main(args):
     fa_pbar = tqdm(bit_groups.items())
     fa_pbar.set_description('Analyzing Fault Bit Groups')
     
-    # Define and evaluate each fault bit and generate data structure for a report
+    # Define and evaluate each fault bit and print each bit group's report as it is analyzed
+    outfile = get_outfile_name(args.out_file, args.fault_bits)
+    statistics = Statistics()
     fault_report = {}
-    for bg, grp_bits in fa_pbar:
-        fault_report[bg] = analyze_bit_group(grp_bits, frame_list, tilegrid, tile_imgs, design_bits, design)
+    with open(outfile, 'w') as out_f:
+        for bg, grp_bits in fa_pbar:
+            group_bits = analyze_bit_group(grp_bits, frame_list, tilegrid, tile_imgs, design_bits, design)
 
-    # Create and output report based on analysis of fault bits
-    print('Printing Fault Report...')
-    outfile = get_outfile_name(args.out_file, args.fault_bits)
-    statistics = print_fault_report(outfile, fault_report)
+            # Print the group's report and update total stats with the group's stats
+            group_stats = print_bit_group(bg, group_bits, out_f)
+            if group_stats:
+                statistics.update(group_stats.stats)
+
+            # Only keep the analyzed bit groups if they need to be exported
+            if args.pickle:
+                fault_report[bg] = group_bits
 
     # Calculate and print fault bit statistics
     print('Printing Statistical Footer...')
@@ -407,6 +402,11 @@ def main(args):
         print('Exporting Fault Report to .pickle...')
         pickle_fault_report(outfile, fault_report)
 
+    # Save the Vivado design lookups for later runs if a query cache file is given
+    if args.query_cache and not args.rapidwright:
+        print('Saving Design Query Cache...')
+        design.save_query_cache()
+
 if __name__ == '__main__':
     import argparse
     # Create Argument Parser to take in commandline arguments
@@ -425,6 +425,9 @@ if __name__ == '__main__':
                         help='Flag to use Rapidwright to read design data')
     parser.add_argument('-p', '--pickle', action='store_true',
                         help='Flag to write a .pickle file containing the raw fault report data')
+    parser.add_argument('-qc', '--query_cache', default='',
+                        help='File to save Vivado design lookups to and reuse them from on later '
+                        + 'runs of the same design')
     # Optional Output File Path
     parser.add_argument('-of', '--out_file', default='',
                         help='File path where the output is to be written.')
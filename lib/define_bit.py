@@ -24,6 +24,14 @@
     and function of bits from the bitstream.
 '''
 
+import sys
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from lib.tile import get_tile_type
+
+# Frame indexes of the tilegrids used to find the tiles of bits and the tiles found for each word
+tilegrid_indexes = {}       # {id(tilegrid) : (tilegrid, frame_index, {(frame, word) : [candidate tile]})}
+
 class Bit:
     '''
         Generates and stores information on an individual bit in the bitstream
@@ -37,6 +45,8 @@ class Bit:
                 phys_fctns - the bit's functions as found in the Project X-Ray database
     '''
 
+    __slots__ = ('bit', 'tile', 'addr', 'phys_fctns')
+
     def __init__(self, bitstream_addr:str, tilegrid:dict, tile_imgs:dict):
         # Set initial values for class attributes
         self.bit = bitstream_addr
@@ -54,8 +64,9 @@ class Bit:
                            of the part's tiles.
         '''
 
-        # Get the bit's tile address
-        tile_addr, potential_tiles = bit_tile_addr(self.bit.split('_')[1:], tilegrid, tile_imgs)
+        # Get the bit's tile address from the frame address, word offset, and bit offset of the bit
+        _, frame_addr, word_offset, bit_offset = self.bit.split('_')
+        tile_addr, potential_tiles = bit_tile_addr(int(frame_addr, 16), int(word_offset), int(bit_offset), tilegrid, tile_imgs)
 
         # Update the bit's tile and address if a correct tile address was found
         if tile_addr:
@@ -65,41 +76,8 @@ class Bit:
 
         # Associate the bit with its physical resources/functions if a tile address was found
         if self.tile and self.tile != 'NA' and type(self.tile) != list:
-            t_tp = self.tile[:self.tile.find('_X')]
-
-            # Separate association of bits for INT tiles from bits from other tiles
-            if 'INT_L' in t_tp or 'INT_R' in t_tp:
-                # Check each routing mux in the tile for the given bit
-                for mux_name, mux in tile_imgs[t_tp].resources.items():
-                    # Identify if the bit is in the row bits or column bits for the routing mux
-                    if self.addr in mux.row_bits:
-                        mux_str = f'{mux_name} {mux.mux_type} Routing Mux'
-                        bit_type = 'Row Bit'
-                        self.phys_fctns.append([mux_str, bit_type])
-                        break
-                    elif self.addr in mux.col_bits:
-                        mux_str = f'{mux_name} {mux.mux_type} Routing Mux'
-                        bit_type = 'Column Bit'
-                        self.phys_fctns.append([mux_str, bit_type])
-                        break
-
-            # Seperate association of BRAM data initialization bits from other bits
-            elif 'BRAM' in t_tp and bus_val == 0:
-                # Check if the bit matches the intialization bit of a BRAM resource
-                for curr_fctn, fctn_bit in tile_imgs[t_tp].init_resources.items():
-                    # If the bit matches, add the resource to the bit's function list
-                    if fctn_bit == self.addr:
-                        fctn_list = curr_fctn.split('.')
-                        self.phys_fctns.append(fctn_list)
-            
-            # Standard bit resource association
-            else:
-                # Search for the bit in each function for the given tile
-                for curr_fctn, fctn_bits in tile_imgs[t_tp].resources.items():
-                    # Add bit to bit functions if bit address is found in the function bits
-                    if any([bit.replace('!', '') == self.addr for bit in fctn_bits]):
-                        fctn_list = curr_fctn.split('.')
-                        self.phys_fctns.append(fctn_list)
+            tile_img = tile_imgs[get_tile_type(self.tile)]
+            self.phys_fctns.extend(tile_img.get_bit_fctns(self.addr, bus_val))
 
     def __str__(self):
         '''
@@ -117,51 +95,124 @@ class Bit:
 #   Functions for Conversion Between Bit Formats   #
 ####################################################
 
-def bit_tile_addr(bitstream_addr:list, tilegrid:dict, tile_imgs:dict):
+def bit_tile_addr(bit_frame:int, word_offset:int, bit_offset:int, tilegrid:dict, tile_imgs:dict):
     '''
         Converts a bit's bitstream address to its tile and tile address
-            Arguments: List of the bitstream address and dicts of the tilegrid and tile images
+            Arguments: Ints of the bit's frame address, word offset, and bit offset and dicts of
+                       the tilegrid and tile images
             Returns: 3-element list with strings of the bit's tile, tile address, and an int of the
                      tilegrid data index the bit's data is found at in its tile. Also returns the
                      list of potential bits from the frame address and word offset
     '''
 
-    bit_tiles = {}                                  # {tile : dataset index}
-    bit_frame = int(bitstream_addr[0], 16)
-    word_offset = int(bitstream_addr[1])
-    bit_offset = int(bitstream_addr[2])
+    # Get the tiles which can potentially have the bit (shared by all bits in the same word)
+    word_tiles = get_word_tiles(bit_frame, word_offset, tilegrid)
+    bit_tiles_list = [bit_tile for bit_tile, _, _, _ in word_tiles]
 
-    # Iterate through the tiles from the tilegrid to find which ones can potentially have the bit
-    for curr_tile, info in tilegrid.items():
-        # Check each dataset for the current tile to see if the base address can match
-        for i, baseaddr in enumerate(info['baseaddr']):
-            # Check if the bit frame address is in the range for the current tile
-            if bit_frame >= baseaddr and bit_frame <= baseaddr + (info['frames'][i] - 1):
-                # If the word offset is within the range for the current tile, add it to the list
-                if word_offset >= info['offset'][i] and word_offset <= info['offset'][i] + (info['words'][i] - 1):
-                    bit_tiles[curr_tile] = i
-
-    bit_tiles_list = list(bit_tiles.keys())
-
-    # If any potential tiles are found check if they use the bit
-    if bit_tiles:
-        # Iterate through the potential tiles and check if they use the bit
-        for bit_tile, i in bit_tiles.items():
-            frame_addr = bit_frame - tilegrid[bit_tile]['baseaddr'][i]
-            bit_addr = bit_offset + (32 * (word_offset - tilegrid[bit_tile]['offset'][i]))
-
-            addr = '{:02}_{:02}'.format(frame_addr, bit_addr)
-            ttp_name = bit_tile[:bit_tile.find('_X')]
-
-            # Check if this is a BRAM initialization bit
-            if 'BRAM' in ttp_name and i == 0 and addr in tile_imgs[ttp_name].init_bits:
-                return [bit_tile, addr, i], bit_tiles_list
-
-            # Check the tile archetype's config bits for the bit
-            elif (addr in tile_imgs[ttp_name].config_bits):
-                return [bit_tile, addr, i], bit_tiles_list
+    # Iterate through the potential tiles and check if they use the bit
+    for bit_tile, i, frame_addr, word_bit_addr in word_tiles:
+        bit_addr = word_bit_addr + bit_offset
+        addr_key = (frame_addr << 16) | bit_addr
+        tile_img = tile_imgs[get_tile_type(bit_tile)]
+
+        # Check if this is a BRAM initialization bit or check the tile archetype's config bits for
+        # the bit, only formatting the tile address once the bit is found
+        if (tile_img.is_bram and i == 0 and addr_key in tile_img.init_bit_keys) or \
+                addr_key in tile_img.config_bit_keys:
+            addr = sys.intern('{:02}_{:02}'.format(frame_addr, bit_addr))
+            return [bit_tile, addr, i], bit_tiles_list
     return [], bit_tiles_list
 
+def get_tilegrid_index(tilegrid:dict):
+    '''
+        Gets the frame index of the tilegrid, building it on the tilegrid's first use
+            Arguments: Dict of the part's tilegrid
+            Returns: Sorted list of the base frame addresses in the tilegrid, dict of the word
+                     offset index of the datasets at each base frame address, and an int of the
+                     most frames in a dataset
+    '''
+
+    try:
+        return tilegrid_indexes[id(tilegrid)][1]
+    except KeyError:
+        pass
+
+    base_datasets = {}      # {baseaddr : [(offset, words, frames, tile_pos, tile, dataset_index)]}
+
+    # Group each dataset of each tile under its base frame address
+    for tile_pos, (curr_tile, info) in enumerate(tilegrid.items()):
+        for i, baseaddr in enumerate(info['baseaddr']):
+            dataset = (info['offset'][i], info['words'][i], info['frames'][i], tile_pos, curr_tile, i)
+            try:
+                base_datasets[baseaddr].append(dataset)
+            except KeyError:
+                base_datasets[baseaddr] = [dataset]
+
+    # Sort the datasets at each base frame address by their word offsets so the ones that can
+    # contain a word can be found with a binary search
+    word_indexes = {}       # {baseaddr : ([offset], [dataset], max_words)}
+    for baseaddr, datasets in base_datasets.items():
+        datasets.sort()
+        max_words = max(ds[1] for ds in datasets)
+        word_indexes[baseaddr] = ([ds[0] for ds in datasets], datasets, max_words)
+
+    max_frames = max((ds[2] for datasets in base_datasets.values() for ds in datasets), default=1)
+    frame_index = (sorted(word_indexes), word_indexes, max_frames)
+
+    # Keep a reference to the tilegrid with its index so its id can't be reused by another dict
+    tilegrid_indexes[id(tilegrid)] = (tilegrid, frame_index, {})
+
+    return frame_index
+
+def get_word_tiles(bit_frame:int, word_offset:int, tilegrid:dict):
+    '''
+        Finds the tiles whose tilegrid data contains the given frame and word, saving the result
+        for any other bits in the same word
+            Arguments: Ints of the frame address and word offset and a dict of the part's tilegrid
+            Returns: List of tuples of each potential tile, the index of its matching dataset, the
+                     frame's address in the tile, and the tile address of the word's first bit
+                     (in tilegrid order)
+    '''
+
+    base_addrs, base_datasets, max_frames = get_tilegrid_index(tilegrid)
+    word_tiles = tilegrid_indexes[id(tilegrid)][2]
+
+    try:
+        return word_tiles[(bit_frame, word_offset)]
+    except KeyError:
+        pass
+
+    # Find the datasets whose frame ranges can contain the frame address
+    first_base = bisect_left(base_addrs, bit_frame - max_frames + 1)
+    last_base = bisect_right(base_addrs, bit_frame)
+
+    matches = []
+    for baseaddr in base_addrs[first_base:last_base]:
+        # Find the datasets at the base address whose word offset ranges can contain the word
+        offsets, datasets, max_words = base_datasets[baseaddr]
+        first_ds = bisect_left(offsets, word_offset - max_words + 1)
+        last_ds = bisect_right(offsets, word_offset)
+
+        for offset, words, frames, tile_pos, curr_tile, i in datasets[first_ds:last_ds]:
+            # Check if the frame address and word offset are in the range for the dataset
+            if bit_frame <= baseaddr + (frames - 1) and word_offset <= offset + (words - 1):
+                matches.append((tile_pos, i, curr_tile))
+
+    # Order the potential tiles as they are in the tilegrid, using each tile's last matching dataset
+    bit_tiles = {}          # {tile : dataset index}
+    for _, i, curr_tile in sorted(matches):
+        bit_tiles[curr_tile] = i
+
+    # Find the frame and the address of the word's first bit within each tile for the dataset
+    cand_tiles = []
+    for curr_tile, i in bit_tiles.items():
+        frame_addr = bit_frame - tilegrid[curr_tile]['baseaddr'][i]
+        word_bit_addr = 32 * (word_offset - tilegrid[curr_tile]['offset'][i])
+        cand_tiles.append((curr_tile, i, frame_addr, word_bit_addr))
+
+    word_tiles[(bit_frame, word_offset)] = cand_tiles
+    return cand_tiles
+
 def bit_bitstream_addr(tile_addr:list, tilegrid:dict):
     '''
         Converts a bit's tile and tile address into its bitstream address
@@ -173,15 +224,38 @@ def bit_bitstream_addr(tile_addr:list, tilegrid:dict):
     # Convert the bit back to its original format if one is provided
     if tile_addr:
         tile, addr, data_index = tile_addr
-        frame_offset, bit = addr.split('_')
-        baseaddr = tilegrid[tile]['baseaddr'][data_index]
-        word_offset = tilegrid[tile]['offset'][data_index]
+        return bit_bitstream_addrs(tile, (addr,), tilegrid, data_index)[addr]
+    return ''
 
-        frame = baseaddr + int(frame_offset)
+def bit_bitstream_addrs(tile:str, addrs, tilegrid:dict, data_index:int = 0):
+    '''
+        Converts a group of bit tile addresses from the same tile into their bitstream addresses,
+        looking up the tile's base frame and word offset only once for the whole group
+            Arguments: String of the bits' tile, iterable of strings of the bits' tile addresses,
+                       dict of the part's tilegrid, and an int of the tilegrid data index
+            Returns: Dict of each bit's bitstream address keyed by its tile address
+    '''
 
-        bit = int(bit)
-        word = word_offset + int(bit / 32)
-        bit = bit % 32
+    baseaddr = tilegrid[tile]['baseaddr'][data_index]
+    word_offset = tilegrid[tile]['offset'][data_index]
 
-        return 'bit_{:08x}_{:03}_{:02}'.format(frame, word, bit)
-    return ''
+    # Convert each bit's frame and bit offsets within the tile to its bitstream address
+    bitstream_addrs = {}
+    for addr in addrs:
+        frame_offset, word_delta, bit = split_tile_addr(addr)
+        bitstream_addrs[addr] = f'bit_{baseaddr + frame_offset:08x}_{word_offset + word_delta:03}_{bit:02}'
+
+    return bitstream_addrs
+
+@lru_cache(maxsize=None)
+def split_tile_addr(addr:str):
+    '''
+        Separates a bit's tile address into its offsets from the tile's base address (cached,
+        since tiles of the same type share the same tile addresses)
+            Arguments: String of the bit's tile address
+            Returns: Ints of the bit's frame offset, word offset, and bit offset in its word
+    '''
+
+    frame_offset, bit = addr.split('_')
+    bit = int(bit)
+    return int(frame_offset), bit >> 5, bit & 31
@@ -25,10 +25,15 @@
 '''
 
 from abc import ABCMeta, abstractmethod
+from codecs import getincrementaldecoder
+from collections import deque
 from subprocess import Popen, PIPE, STDOUT
-from threading import Thread
-from queue import Queue, Empty
+from threading import Condition, Thread
+import hashlib
+import os
+import pickle
 import re
+import sys
 
 ###################################
 #  VivadoQuery Outstream Classes  #
@@ -36,41 +41,65 @@ import re
 
 class OutStreamReader:
     '''
-        Non-blocking output stream reader for reading vivado output from the pipe
+        Non-blocking output stream reader for reading vivado output from the pipe. Lines are
+        stripped before being queued and empty lines are never queued, so every line read is
+        non-empty with no trailing newline.
             Arguments: The output stream to read from
             
             Attributes:
                 _s - Stream to read from
 
-                _q - Queue to load the stream output into
+                _q - Queue of the stripped, non-empty lines read from the stream
+
+                _cv - Condition guarding the queue and signalling when new lines are added
+
+                _lines - Lines taken from the queue that haven't been read yet, only used by the
+                         reading thread so they can be read without taking the queue's lock
 
                 _t - Thread object on which the stream reader runs
     '''
 
     def __init__(self, stream):
         self._s = stream
-        self._q = Queue()
+        self._q = deque()
+        self._cv = Condition()
+        self._lines = deque()
 
-        def _populateQueue(stream, queue:Queue):
+        def _populateQueue(stream, queue:deque, cv:Condition):
             '''
-                Populates the Queue and starts collecting lines from the stream
-                    Arguments: Stream to read from and a queue to load stream output into
+                Populates the Queue and starts collecting lines from the stream. The stream is read
+                in large chunks and split into lines in bulk rather than being read line by line.
+                    Arguments: Stream to read from, a queue to load stream output into, and the
+                               condition guarding the queue
             '''
 
+            fd = stream.fileno()
+            decoder = getincrementaldecoder(stream.encoding)()
+            partial_line = ''
+
             while True:
-                line = stream.readline()
+                chunk = os.read(fd, 65536)
 
-                # Add line to queue if it exists and contains information
-                if line:
-                    # Add line if is not just a newline char
-                    if line.strip():
-                        queue.put(line.strip())
+                # Split the chunk into lines, holding back any partial line until it is completed
+                if chunk:
+                    lines = (partial_line + decoder.decode(chunk)).split('\n')
+                    partial_line = lines.pop()
                 else:
+                    lines = [partial_line]
+
+                # Add any lines that contain information (not just a newline char) to the queue
+                lines = [line.strip() for line in lines if line.strip()]
+                if lines:
+                    with cv:
+                        queue.extend(lines)
+                        cv.notify_all()
+
+                if not chunk:
                     raise UnexpectedEndOfStream
 
         # Load the stream reader into a different Thread
         self._t = Thread(target = _populateQueue,
-                args = (self._s, self._q))
+                args = (self._s, self._q, self._cv))
         self._t.daemon = True
 
         # Start collecting lines from the stream reader
@@ -83,11 +112,19 @@ class OutStreamReader:
                 Returns: Stream output if any is read or None if not
         '''
         
+        # Take all of the queued lines at once when there are no lines left to read
+        if not self._lines:
+            with self._cv:
+                if timeout is not None:
+                    self._cv.wait_for(lambda: self._q, timeout=timeout)
+
+                self._lines.extend(self._q)
+                self._q.clear()
+
         # Get the next line if it exists, if not return None
         try:
-            return self._q.get(block=timeout is not None,
-                    timeout = timeout)
-        except Empty:
+            return self._lines.popleft()
+        except IndexError:
             return None
 
 class UnexpectedEndOfStream(Exception): pass
@@ -114,6 +151,13 @@ class DesignQuery(object):
 
                 wires - Collection of the location, name, and connections of wires in the design
 
+                global_sites - Collection of the design sites found for each tile's offset site names
+
+                site_bel_cells - Collection of the cells related to each BEL name in a site, indexed
+                                 under both the full and shortened (i.e. ALUT for A6LUT) BEL names
+
+                traced_rsrcs - Collection of the affected resources found by previous net traces
+
             Abstract Methods:
                 query_nets - Queries the design for the nets in a provided tile
 
@@ -137,6 +181,9 @@ class DesignQuery(object):
         self.pips = {}       # {net : [(source, sink)]}
         self.cells = {}      # {tile : {site : {bel : cell}}}
         self.wires = {}      # {tile : {wire : [connections]}}
+        self.global_sites = {}      # {tile : {local_site : global_site}}
+        self.site_bel_cells = {}    # {tile : {site : {bel : cells}}}
+        self.traced_rsrcs = {}      # {(net, tile, sink_wire) : affected_rsrcs}
 
         self.tiles_queried_nets = set()
 
@@ -238,20 +285,26 @@ class DesignQuery(object):
 
     def get_affected_rsrcs(self, net:str, init_tile:str, init_sink_wire:str):
         '''
-            Wrapper function for recursive function trace_affected_resources
+            Wrapper function for the design's trace_affected_resources function (traces are saved
+            so fault bits in the same tile and mux reuse them)
                 Arguments: Strings of the net to trace and the tile and sink node to
                            begin the trace at
                 Returns: List of the resources affected by the net downstream of the
                          initial tile and sink node
         '''
 
-        init_rsrcs = set()
-        traced_nodes = set()
-        affected_rsrcs, traced_nodes = self.trace_affected_resources(net,
-                                                init_tile, init_sink_wire,
-                                                traced_nodes, init_rsrcs)
+        trace_key = (net, init_tile, init_sink_wire)
 
-        return list(affected_rsrcs)
+        # Trace the net's affected resources if this trace hasn't been run yet
+        if trace_key not in self.traced_rsrcs:
+            init_rsrcs = set()
+            traced_nodes = set()
+            affected_rsrcs, traced_nodes = self.trace_affected_resources(net,
+                                                    init_tile, init_sink_wire,
+                                                    traced_nodes, init_rsrcs)
+            self.traced_rsrcs[trace_key] = affected_rsrcs
+
+        return list(self.traced_rsrcs[trace_key])
 
     @abstractmethod
     def trace_affected_resources(self, net:str, tile:str, node:str, traced_nodes:set, affected_rsrcs:set):
@@ -397,11 +450,107 @@ class VivadoQuery(DesignQuery):
                 cells - Collection of the location and name of cells in the design
 
                 wires - Collection of the location, name, and connections of wires in the design
+
+                batch_cnt - Number of command batches sent through the pipe, used to give each
+                            command in a batch a unique end marker
+
+                site_pin_cells - Collection of the cells connected to each site pin of a site
+
+                cell_sites - Collection of the tile and site each queried cell is placed in
+
+                cmd_outputs - Collection of the saved outputs of wire, node, site, cell, pin, and net
+                              lookup commands
+
+                query_cache - Path of the file the saved command outputs are kept in between runs
+                              on the same design (no file is used if empty)
+
+                dcp_hash - SHA-256 hash of the design's dcp file, used to check that a query cache
+                           file was saved for the same design
+
+                cmds_hash - SHA-256 hash of the query cache format and the saved commands' tcl, used
+                            to check that a query cache file was saved with the same commands
     '''
 
+    # Tcl command templates for each command name, formatted with the command's arguments
+    TCL_CMDS = {
+        # Top-level commands
+        'readCheckpoint' : 'open_checkpoint {arg1}\n',
+        'setDisplayLimit' : 'set_param tcl.collectionResultDisplayLimit {arg1}\n',
+        'supressInfoMsgs' : 'set_msg_config -severity INFO -suppress\n',
+        'setMsgLimit' : 'set_param messaging.defaultLimit {arg1}\n',
+        'getDesignPart' : 'puts [get_property PART [current_design]]\n',
+        # Net Commands
+        'getNets' : 'puts [get_nets -hierarchical {arg1}*]\n',
+        'getNetPIPs' : 'puts [get_pips -of [get_nets {arg1}] {arg2}*]\n',
+        'getNetCells' : 'puts [get_cells -of [get_nets {arg1}]]\n',
+        'getNetAliases' : 'puts [get_nets -hier -segments -filter {{NAME =~ {arg1}}}]\n',
+        'getNetAliasCells' : 'puts [lsort -unique [get_cells -of [get_nets -hier -segments -filter {{NAME =~ {arg1}}}]]]\n',
+        # Site Commands
+        'getSiteCells' : 'puts [get_cells -of [get_sites {arg1}]]\n',
+        'getSiteTile' : 'puts [get_tiles -of [get_sites {arg1}]]\n',
+        # Tile Commands
+        'getTileSites' : 'puts [get_sites -of [get_tiles {arg1}]]\n',
+        'getTileNets' : 'puts [get_nets -of [get_tiles {arg1}]]\n',
+        'getTileWires' : 'set names []; foreach w [get_wires -of [get_tiles {arg1}]] {{lappend names [string range $w [string last "/" $w]+1 [string length $w]] }}; puts $names\n',
+        'getCLBTiles' : 'puts [get_tiles -of [get_sites -filter IS_USED=={arg1} SLICE*]]\n',
+        'getINTTiles' : 'puts [get_tiles -of [get_nets] INT*]\n',
+        # PIP Commands
+        'getPIPNet' : 'puts [get_nets -of [get_pips {arg1}]]\n',
+        # Cell Commands
+        'getCellBEL' : 'puts [set n [get_property BEL [get_cells {arg1}]]; string range $n [string last "." $n]+1 [string length $n]]\n',
+        'getCellPins' : 'puts [get_pins -of [get_cells {arg1}]]\n',
+        'getCellOutputPins' : 'puts [get_pins -of [get_cells {arg1}] -filter {{DIRECTION == OUT}}]\n',
+        'getCellSitePins' : 'puts [get_site_pins -of [get_pins -of [get_cells {arg1}]]]\n',
+        'getCellProperty' : 'puts [get_property {arg2} [get_cells {arg1}]]\n',
+        'getCellPinMappings' : 'set names []; foreach p [get_pins -of [get_cells {arg1}]] {{lappend names [get_bel_pins -of $p]:$p}}; puts $names\n',
+        # Pin/SitePin Commands
+        'getPinNet' : 'puts [get_nets -of [get_pins {arg1}]]\n',
+        'getPinDirection' : 'puts [get_property DIRECTION [get_pins {arg1}]]\n',
+        # Node Commands
+        'getNodeSite' : 'puts [get_sites -of [get_site_pins -of [get_nodes {arg1}]]]\n',
+        'getNodeSitePin' : 'puts [get_site_pins -of [get_nodes {arg1}]]\n',
+        'getNodeWires' : 'puts [get_wires -of [get_nodes {arg1}]]\n',
+        # Wire Commands
+        'getWireConnections' : 'puts [get_nodes -downhill -of [get_nodes -of [get_wires {arg1}/{arg2}]]]\n',
+        'getWireNode' : 'puts [get_nodes -of [get_wires {arg1}]]\n'
+    }
+
+    # Commands whose output is returned as a string instead of a list
+    STR_CMDS = frozenset(('getCellBEL', 'getPIPNet', 'getDesignPart', 'getPinNet', 'getSiteTile',
+                          'getPinDirection', 'getNodeSite', 'getNodeSitePin', 'getWireNode', 'getCellProperty'))
+
+    # Commands which give no output to be returned
+    SETTING_CMDS = frozenset(('readCheckpoint', 'setDisplayLimit', 'supressInfoMsgs', 'setMsgLimit'))
+
+    # Wire, node, site, cell, pin, and net lookup commands whose outputs are saved for repeated queries
+    SAVED_CMDS = frozenset(('getWireNode', 'getWireConnections', 'getNodeWires', 'getNodeSite',
+                            'getNodeSitePin', 'getSiteTile', 'getCellPins', 'getCellOutputPins',
+                            'getPinDirection', 'getPinNet', 'getNetAliases', 'getNetCells',
+                            'getNetAliasCells'))
+
+    # Version of the query cache file format, to be changed whenever the saved outputs change form
+    QUERY_CACHE_VERSION = 1
+
+    # Name endings of the global logic (GND and VCC) nets
+    CONST_NETS = ('<const0>', '<const1>')
+
+    # Parts of a PIP string (tile, source pin, and sink pin) around its divider symbol
+    PIP_PARTS = re.compile(r'([^/]+)/[^.]*\.([^.]+?)(?:<<->>|->>|->)([^.]+)')
+
     # Class Constructor
-    def __init__(self, dcp):
+    def __init__(self, dcp, query_cache:str=''):
         super().__init__(dcp)
+        self.batch_cnt = 0
+        self.site_pin_cells = {}    # {site : {site_pin : [cells]}}
+        self.cell_sites = {}        # {cell : (tile, site)}
+        self.cmd_outputs = {}       # {(cmd, arg1, arg2) : output}
+
+        # Reuse the command outputs saved by a previous run on the same design if a cache is used
+        self.query_cache = query_cache
+        self.dcp_hash = ''
+        self.cmds_hash = ''
+        if self.query_cache:
+            self.load_query_cache(dcp)
 
         # Open a pipe to run an instance of vivado through
         self.query = Popen([r'vivado -mode tcl'], shell=True, text=True,
@@ -430,26 +579,73 @@ class VivadoQuery(DesignQuery):
     # Class Deconstructor
     def __del__(self):
         # Remove .jou file and rename .log file as latest_run.log
-        Popen(['rm', 'vivado.jou'])
-        Popen(['mv', 'vivado.log', 'latest_run.log'])
+        try:
+            os.unlink('vivado.jou')
+        except FileNotFoundError:
+            pass
+
+        try:
+            os.replace('vivado.log', 'latest_run.log')
+        except FileNotFoundError:
+            pass
 
-    # PIP divider identification
-    def get_pip_divider(self, pip:str):
+    # Query caching
+    def load_query_cache(self, dcp:str):
         '''
-            Determines the divider symbol used in the provided PIP
-                Arguments: String of the PIP to analyze
-                Returns: String of the symbol used to divide the PIP nodes
+            Loads the command outputs saved in the query cache file if the file was saved for the
+            same design checkpoint
+                Arguments: String of the path to the design's dcp file
         '''
 
-        # Select identified divider in PIP
-        if '<<->>' in pip:
-            divider = '<<->>'
-        elif '->>' in pip:
-            divider = '->>'
-        else:
-            divider = '->'
-        
-        return divider
+        # Hash the design checkpoint to identify the design the cache file must be saved for
+        dcp_hash = hashlib.sha256()
+        with open(dcp, 'rb') as dcp_f:
+            for chunk in iter(lambda: dcp_f.read(1 << 20), b''):
+                dcp_hash.update(chunk)
+        self.dcp_hash = dcp_hash.hexdigest()
+
+        # Hash the cache format along with the tcl and output type of each saved command, so that
+        # outputs saved by a version of the commands that has since changed aren't reused
+        cmds_hash = hashlib.sha256(str(VivadoQuery.QUERY_CACHE_VERSION).encode())
+        for cmd in sorted(VivadoQuery.SAVED_CMDS):
+            cmds_hash.update(f'{cmd}:{VivadoQuery.TCL_CMDS.get(cmd, "")}:{cmd in VivadoQuery.STR_CMDS}\n'.encode())
+        self.cmds_hash = cmds_hash.hexdigest()
+
+        # Load the saved command outputs if the cache file exists and matches the design and commands
+        if os.path.exists(self.query_cache):
+            with open(self.query_cache, 'rb') as cache_f:
+                query_cache = pickle.load(cache_f)
+
+            if query_cache.get('dcp_hash') == self.dcp_hash and query_cache.get('cmds_hash') == self.cmds_hash:
+                self.cmd_outputs.update(query_cache['cmd_outputs'])
+
+    def clear_saved_outputs(self):
+        '''
+            Clears the saved command outputs so that later lookups are queried from vivado again
+        '''
+
+        self.cmd_outputs.clear()
+
+    def save_query_cache(self):
+        '''
+            Saves the command outputs queried so far to the query cache file to be reused by later
+            runs on the same design
+        '''
+
+        with open(self.query_cache, 'wb') as cache_f:
+            pickle.dump({'dcp_hash' : self.dcp_hash, 'cmds_hash' : self.cmds_hash,
+                         'cmd_outputs' : self.cmd_outputs}, cache_f)
+
+    # PIP parsing
+    def split_pip(self, pip:str):
+        '''
+            Splits the provided PIP into its tile and the source and sink pins on either side of
+            its divider symbol (<<->>, ->>, or ->)
+                Arguments: String of the PIP to split (<tile>/<tile_type>.<src><divider><sink>)
+                Returns: Strings of the PIP's tile, source pin, and sink pin
+        '''
+
+        return tuple(sys.intern(pip_part) for pip_part in VivadoQuery.PIP_PARTS.match(pip).group(1, 2, 3))
 
     #######################
     #   Design Querying   #
@@ -465,16 +661,14 @@ class VivadoQuery(DesignQuery):
 
         # Verify that nets were found for the tile
         if tile_nets and tile_nets != 'NA':
-            # Get the PIPs for each net in the tile
-            for net in tile_nets:
-                net_pips = self.run_command('getNetPIPs', net, tile)
-
+            # Get the PIPs for each net in the tile in a single batch
+            all_net_pips = self.run_commands([('getNetPIPs', net, tile) for net in tile_nets])
+            for net, net_pips in zip(tile_nets, all_net_pips):
                 # Verify that a real list of PIPs has been found
                 if net_pips and net_pips != 'NA':
                     # Split each PIP into its components and add info to stored net data
                     for pip in net_pips:
-                        tile, pip_pins = pip.split('/')
-                        src_pin, sink_pin = pip_pins.split('.')[1].split(self.get_pip_divider(pip))
+                        tile, src_pin, sink_pin = self.split_pip(pip)
 
                         # Add entry for current tile in the stored net data if there isn't one yet
                         if tile not in self.nets:
@@ -498,8 +692,7 @@ class VivadoQuery(DesignQuery):
         if pips and pips != 'NA':
             # Iterate through each PIP vivado can find for it
             for pip in pips:
-                tile, pip_pins = pip.split('/')
-                src_pin, sink_pin = pip_pins.split('.')[1].split(self.get_pip_divider(pip))
+                tile, src_pin, sink_pin = self.split_pip(pip)
 
                 # Add entry for current net to stored PIP data there isn't one yet
                 if net not in self.pips:
@@ -514,24 +707,35 @@ class VivadoQuery(DesignQuery):
                 Arguments: String of the tile to query
         '''
 
-        tile_sites = self.run_command('getTileSites', tile)
-        # Check that sites were found in the given tile
-        if tile_sites and tile_sites != 'NA':
-            # Iterate through each site instance
-            for site in tile_sites:
-                # Create an entry for the current tile if there isn't one
-                if tile not in self.cells:
-                    self.cells[tile] = {}
-                self.cells[tile][site] = {}
-
-                site_cells = self.run_command('getSiteCells', site)
-                # Check that cells were found in the given site
-                if site_cells and site_cells != 'NA':
-                    # Check each cell found in the site instance and add the BEL and cell
-                    # name to its entry
-                    for cell in site_cells:
-                        bel = self.run_command('getCellBEL', cell)
-                        self.cells[tile][site][bel] = cell
+        self.query_tiles_cells([tile])
+
+    def query_tiles_cells(self, tiles:list):
+        '''
+            Queries vivado for the cells in each of the requested tiles, querying the sites of
+            every tile, the cells of every site, and the BEL of every cell in a batch each
+                Arguments: List of the tiles to query
+        '''
+
+        # Get the sites of every tile and check that sites were found in each tile
+        all_tile_sites = self.run_commands([('getTileSites', tile) for tile in tiles])
+        tile_sites = {tile : sites for tile, sites in zip(tiles, all_tile_sites) if sites and sites != 'NA'}
+
+        # Get the cells of every site instance in a single batch
+        sites = [(tile, site) for tile, sites in tile_sites.items() for site in sites]
+        all_site_cells = self.run_commands([('getSiteCells', site) for _, site in sites])
+
+        # Get the BEL of every cell found in the tiles' sites in a single batch
+        site_cells = [(tile, site, cell) for (tile, site), cells in zip(sites, all_site_cells)
+                      if cells and cells != 'NA' for cell in cells]
+        cell_bels = self.run_commands([('getCellBEL', cell) for _, _, cell in site_cells])
+
+        # Add an entry for each site and the BEL and name of each of its cells
+        for tile, site in sites:
+            self.cells[tile] = self.cells.get(tile, {})
+            self.cells[tile][site] = {}
+        for (tile, site, cell), bel in zip(site_cells, cell_bels):
+            self.cells[tile][site][bel] = cell
+            self.cell_sites[cell] = (tile, site)
 
     def query_wires(self, tile:str):
         '''
@@ -542,9 +746,9 @@ class VivadoQuery(DesignQuery):
         tile_wires = self.run_command('getTileWires', tile)
         # Check that wires were found for the given tile
         if tile_wires and tile_wires != 'NA':
-            # Get connections for each wire found and add them to the stored data
-            for wire in tile_wires:
-                connections = self.run_command('getWireConnections', tile, wire)
+            # Get connections for each wire found in a single batch and add them to the stored data
+            all_connections = self.run_commands([('getWireConnections', tile, wire) for wire in tile_wires])
+            for wire, connections in zip(tile_wires, all_connections):
 
                 # Add the connections found to the wire structure if any are found
                 if connections and connections != 'NA':
@@ -559,20 +763,19 @@ class VivadoQuery(DesignQuery):
             Queries the design for all data related to GND and VCC nets
         '''
 
-        # Query the design for one global logic (<const0>/<const1>) net of each type
-        for const_type in ['<const0>', '<const1>']:
-            nets_found = self.run_command('getNets', f'*{const_type}')
+        # Query the design for the global logic (<const0>/<const1>) nets of each type in one batch
+        const_nets = self.run_commands([('getNets', f'*{const_type}') for const_type in VivadoQuery.CONST_NETS])
 
-            # Choose the net with the shortest name to query for in the design
-            net = min(nets_found, key=len)
-            net_pips = self.run_command('getNetPIPs', net)
+        # Choose the net with the shortest name of each type and query their PIPs in one batch
+        nets = [min(nets_found, key=len) for nets_found in const_nets]
+        all_net_pips = self.run_commands([('getNetPIPs', net) for net in nets])
 
+        for net, net_pips in zip(nets, all_net_pips):
             # Check that PIPs were found for the given net
             if net_pips and net_pips != 'NA':
                 # Add pip info for each pip to the stored nets and pips
                 for pip in net_pips:
-                    tile, pip_pins = pip.split('/')
-                    src_pin, sink_pin = pip_pins.split('.')[1].split(self.get_pip_divider(pip))
+                    tile, src_pin, sink_pin = self.split_pip(pip)
 
                     # Add entry for current tile in the stored net data if there isn't one yet
                     if tile not in self.nets:
@@ -593,14 +796,13 @@ class VivadoQuery(DesignQuery):
     #   Vivado Interfacing   #
     ##########################
 
-    def run_command(self, cmd:str, arg1=None, arg2=None):
+    def gen_tcl_cmd(self, cmd:str, arg1=None, arg2=None):
         '''
-            Generates the appropriate tcl command to run in vivado through
-            the open pipe and get the results back.
+            Generates the appropriate tcl command to run in vivado for the provided command name
                 Arguments: String of the command name, two optional strings of argument inputs
-                Return: List or string of the output from vivado for the provided command
+                Returns: String of the tcl command, or an empty string for an unknown command
         '''
-        
+
         # Set default values of args 1 and 2
         if arg1 is None:
             arg1 = ''
@@ -608,139 +810,166 @@ class VivadoQuery(DesignQuery):
             arg2 = ''
 
         # Select tcl command and format in the provided args if needed
-        tcl = {
-            # Top-level commands
-            'readCheckpoint' : f'open_checkpoint {arg1}\n',
-            'setDisplayLimit' : f'set_param tcl.collectionResultDisplayLimit {arg1}\n',
-            'supressInfoMsgs' : 'set_msg_config -severity INFO -suppress\n',
-            'setMsgLimit' : f'set_param messaging.defaultLimit {arg1}\n',
-            'getDesignPart' : 'puts [get_property PART [current_design]]\n',
-            # Net Commands
-            'getNets' : f'puts [get_nets -hierarchical {arg1}*]\n',
-            'getNetPIPs' : f'puts [get_pips -of [get_nets {arg1}] {arg2}*]\n',
-            'getNetCells' : f'puts [get_cells -of [get_nets {arg1}]]\n',
-            'getNetAliases' : f'puts [get_nets -hier -segments -filter {{NAME =~ {arg1}}}]\n',
-            # Site Commands
-            'getSiteCells' : f'puts [get_cells -of [get_sites {arg1}]]\n',
-            'getSiteTile' : f'puts [get_tiles -of [get_sites {arg1}]]\n',
-            # Tile Commands
-            'getTileSites' : f'puts [get_sites -of [get_tiles {arg1}]]\n',
-            'getTileNets' : f'puts [get_nets -of [get_tiles {arg1}]]\n',
-            'getTileWires' : f'set names []; foreach w [get_wires -of [get_tiles {arg1}]]' + ' {lappend names [string range $w [string last "/" $w]+1 [string length $w]] }; puts $names\n',
-            'getCLBTiles' : f'puts [get_tiles -of [get_sites -filter IS_USED=={arg1} SLICE*]]\n',
-            'getINTTiles' : f'puts [get_tiles -of [get_nets] INT*]\n',
-            # PIP Commands
-            'getPIPNet' : f'puts [get_nets -of [get_pips {arg1}]]\n',
-            # Cell Commands
-            'getCellBEL' : f'puts [set n [get_property BEL [get_cells {arg1}]]; string range $n [string last "." $n]+1 [string length $n]]\n',
-            'getCellPins' : f'puts [get_pins -of [get_cells {arg1}]]\n',
-            'getCellSitePins' : f'puts [get_site_pins -of [get_pins -of [get_cells {arg1}]]]\n',
-            'getCellProperty' : f'puts [get_property {arg2} [get_cells {arg1}]]\n',
-            'getCellPinMappings' : f'set names []; foreach p [get_pins -of [get_cells {arg1}]] {{lappend names [get_bel_pins -of $p]:$p}}; puts $names\n',
-            # Pin/SitePin Commands
-            'getPinNet' : f'puts [get_nets -of [get_pins {arg1}]]\n',
-            'getPinDirection' : f'puts [get_property DIRECTION [get_pins {arg1}]]\n',
-            # Node Commands
-            'getNodeSite' : f'puts [get_sites -of [get_site_pins -of [get_nodes {arg1}]]]\n',
-            'getNodeSitePin' : f'puts [get_site_pins -of [get_nodes {arg1}]]\n',
-            'getNodeWires' : f'puts [get_wires -of [get_nodes {arg1}]]\n',
-            # Wire Commands
-            'getWireConnections' : f'puts [get_nodes -downhill -of [get_nodes -of [get_wires {arg1}/{arg2}]]]\n',
-            'getWireNode' : f'puts [get_nodes -of [get_wires {arg1}]]\n'
-        }.get(cmd, '')
-        
-        # Return latest output from vivado if valid command, or return default value
-        if tcl:
-            # List of commands that return a string instead of a list
-            str_cmds = ['getCellBEL', 'getPIPNet', 'getDesignPart', 'getPinNet', 'getSiteTile',
-                        'getPinDirection', 'getNodeSite', 'getNodeSitePin', 'getWireNode', 'getCellProperty']
-
-            # Send input tcl command to running vivado pipe
-            self.query.stdin.write(tcl)
-            self.query.stdin.flush()
-
-            # Select python object return type based in the command run
-            if cmd in str_cmds:
-                return self.get_vivado_output(cmd, ret_list=False)
-            elif cmd not in ['setDisplayLimit', 'supressInfoMsgs', 'setMsgLimit']:
-                return self.get_vivado_output(cmd)
-            else:
-                return 'NA'
-        else:
-            return 'NA'
-    
-    def get_vivado_output(self, cmd:str, ret_list=None):
+        return VivadoQuery.TCL_CMDS.get(cmd, '').format(arg1=arg1, arg2=arg2)
+
+    def run_command(self, cmd:str, arg1=None, arg2=None):
+        '''
+            Generates the appropriate tcl command to run in vivado through
+            the open pipe and get the results back.
+                Arguments: String of the command name, two optional strings of argument inputs
+                Return: List or string of the output from vivado for the provided command
+        '''
+
+        # Run the command as a batch of one so that its output is read up to its end marker
+        return self.run_commands([(cmd, arg1, arg2)])[0]
+
+    def run_commands(self, cmds:list):
         '''
-            Reads the latest output from the running vivado instance through the open
-            pipe, formats it into the correct python data structure, and returns it
-                Arguments: String of the command being run and a bool indicating
-                           if a list is expected to be returned
-                Returns: List or string of the output from vivado for the provided command
+            Runs a batch of commands in vivado and gets the results of each back. Outputs saved
+            from earlier lookup commands are reused and repeated commands are only sent once.
+                Arguments: List of tuples of the command name and its argument inputs
+                Returns: List of the output from vivado (list or string) for each command
         '''
 
-        # Set default values for bool flags
-        if ret_list is None:
-            ret_list = True
-        end_reached = False
+        # Get the commands that need to be sent to vivado
+        cmd_keys = [tuple(cmd) + (None,) * (3 - len(cmd)) for cmd in cmds]
+        new_keys = list(dict.fromkeys(key for key in cmd_keys if key not in self.cmd_outputs))
+        new_outputs = dict(zip(new_keys, self.send_commands(new_keys)))
 
-        # Read output stream as needed by the command running
-        if cmd == 'readCheckpoint':
-            # Get the next line until the last line output by reading a dcp is output
-            while not end_reached:
-                line = self.outstream.readline()
+        # Save the outputs of the lookup commands for later queries, keeping list outputs as tuples
+        self.cmd_outputs.update({key : tuple(output) if type(output) == list else output
+                                 for key, output in new_outputs.items() if key[0] in VivadoQuery.SAVED_CMDS})
 
-                # If the current line contains the indiciting substring return default value
-                if line and 'open_checkpoint: Time (s):' in line:
-                    return 'NA'
-        else:
-            # Get the next line until a real line is output that isn't just a newline
-            while not end_reached:
-                line = self.outstream.readline()
-
-                # Save the raw output and flag the end of reading from the outstream
-                if line and line != '\n':
-                    # On very large function returns, two extra lines are given before the return
-                    if 'tcmalloc: large alloc' in line or 'Time (s)' in line:
-                        continue
+        outputs = []
+        for key in cmd_keys:
+            output = new_outputs[key] if key in new_outputs else self.cmd_outputs[key]
+
+            # Copy list outputs (and saved tuple outputs) so that saved outputs aren't changed by the caller
+            outputs.append(list(output) if type(output) in (list, tuple) else output)
+
+        return outputs
 
-                    end_reached = True
-                    raw_out = line
+    def run_lookups(self, cmd:str, args):
+        '''
+            Runs a lookup command for each unique argument in a single batch
+                Arguments: String of the command name and an iterable of the argument for each lookup
+                Returns: Dict of each argument and the output from vivado for its lookup
+        '''
+
+        args = list(dict.fromkeys(args))
+        return dict(zip(args, self.run_commands([(cmd, arg) for arg in args])))
+
+    def send_commands(self, cmds:list):
+        '''
+            Sends a batch of commands to vivado through the open pipe with a single write and gets
+            the results of each back. Each command is followed by a unique end marker so that the
+            output of every command can be separated when it is read back.
+                Arguments: List of tuples of the command name and its argument inputs
+                Returns: List of the output from vivado (list or string) for each command
+        '''
+
+        if not cmds:
+            return []
 
-                    # Remove all WARNING messages when a command comes back as invalid
-                    if 'WARNING' in line:
-                        # Continue reading in lines from the outstream until all messages are gone
-                        while line and 'WARNING' in line:
-                            line = self.outstream.readline()
+        # Generate the tcl for each command along with the end marker printed after it
+        self.batch_cnt += 1
+        end_markers = [f'__BFAT_END_{self.batch_cnt}_{i}__' for i in range(len(cmds))]
+        tcl_cmds = [self.gen_tcl_cmd(*cmd) for cmd in cmds]
+        script = ''.join(f'{tcl}puts {end_marker}\n' for tcl, end_marker in zip(tcl_cmds, end_markers))
 
-        # Check that raw output is not a system message
-        if raw_out and not any([mT in raw_out for mT in ['WARNING:', 'ERROR:', 'Resolution']]):
-            # Return a string or list from the vivado output as decided by ret_list parameter
+        # Send the whole batch to the running vivado pipe at once
+        self.query.stdin.write(script)
+        self.query.stdin.flush()
+
+        # Read back the output lines of each command until its end marker is reached
+        outputs = []
+        for (cmd, *_), tcl, end_marker in zip(cmds, tcl_cmds, end_markers):
+            out_lines = []
+            while True:
+                line = self.outstream.readline(timeout=1)
+                if line == end_marker:
+                    break
+                elif line:
+                    out_lines.append(line)
+
+            # Format the output for valid commands that give a result
+            if tcl and cmd not in VivadoQuery.SETTING_CMDS:
+                outputs.append(self.format_vivado_output(out_lines, ret_list=cmd not in VivadoQuery.STR_CMDS))
+            else:
+                outputs.append('NA')
+
+        return outputs
+
+    def format_vivado_output(self, out_lines:list, ret_list:bool):
+        '''
+            Formats the output lines read back for a single command into the correct python data
+            structure
+                Arguments: List of the lines output for the command and a bool indicating if a list
+                           is expected to be returned
+                Returns: List or string of the output from vivado, or 'NA' if no valid output
+        '''
+
+        # Skip the two extra lines given before the return on very large function returns
+        out_lines = [line for line in out_lines if 'tcmalloc: large alloc' not in line and 'Time (s)' not in line]
+
+        # Check that raw output exists and is not a system message
+        if out_lines and not any([mT in out_lines[0] for mT in ['WARNING:', 'ERROR:', 'Resolution']]):
+            # Return a string or list from the vivado output as decided by ret_list parameter,
+            # interning the names so that repeated design names share a single string
             if ret_list:
-                return raw_out.split(' ')
+                return [sys.intern(item) for item in out_lines[0].split(' ')]
             else:
-                return raw_out
+                return sys.intern(out_lines[0])
 
         return 'NA'
-
+    
     #################################
     #   Affected Resource Tracing   #
     #################################
 
     def trace_affected_resources(self, net:str, tile:str, wire:str, traced_nodes:set, affected_rsrcs:set):
         '''
-            Recursively traces downstream through the net in the design from the provided
-            tile and node.
+            Traces downstream through the net in the design from the provided tile and node.
+            Nodes are traced depth-first through a stack of the connections left to trace from
+            each node rather than by recursion.
                 Arguments: String of the net to be traced, the current tile, and the current node;
                            and sets of the current nodes traced and affected resources found
                 Returns: Updated sets of the nodes traced and affected resources found after
                          tracing this node
         '''
-        
-        # Get the node from the current wire
-        current_node = self.run_command('getWireNode', f'{tile}/{wire}')
 
-        # Find any non-INT or same-tile wire connections for the initial node
-        sink_conns = {conn for conn in self.run_command('getWireConnections', tile, wire)}
+        # Trace the initial node and get the connections to trace further from it
+        trace_stack = [iter(self.trace_node(net, tile, wire, traced_nodes, affected_rsrcs))]
+
+        # Trace the next connection of the latest traced node until no connections are left
+        while trace_stack:
+            conn = next(trace_stack[-1], None)
+
+            # Return to the previous node once all of the current node's connections are traced
+            if conn is None:
+                trace_stack.pop()
+
+            # Trace the connection if it hasn't been traced yet since it was found
+            elif conn not in traced_nodes:
+                conn_tile, conn_node = conn.split('/')
+                trace_stack.append(iter(self.trace_node(net, conn_tile, conn_node, traced_nodes, affected_rsrcs)))
+
+        return affected_rsrcs, traced_nodes
+
+    def trace_node(self, net:str, tile:str, wire:str, traced_nodes:set, affected_rsrcs:set):
+        '''
+            Finds the resources affected by the net at the node of the provided tile and wire and
+            the downstream connections of the node used by the net
+                Arguments: String of the net to be traced, the current tile, and the current node;
+                           and sets of the current nodes traced and affected resources found
+                Returns: List of the node's downstream connections to be traced
+        '''
+
+        # Get the node from the current wire and find any non-INT or same-tile wire connections
+        # for the initial node in a single batch
+        current_node, wire_conns = self.run_commands([('getWireNode', f'{tile}/{wire}'),
+                                                      ('getWireConnections', tile, wire)])
+        sink_conns = set(wire_conns)
 
         # Re-initialize to an empty set if no downstream wire connections were found
         if 'N' in sink_conns and 'A' in sink_conns:
@@ -753,78 +982,144 @@ class VivadoQuery(DesignQuery):
 
         traced_nodes.add(current_node)
 
+        # Submit the independent queries for every connection ahead of tracing them: the wires of
+        # the current node and each connection and the site pin of each non-INT connection
+        sink_conns = list(sink_conns)
+        site_conns = [conn for conn in sink_conns if 'INT' not in conn.split('/')[0]]
+        conn_outputs = self.run_commands([('getNodeWires', current_node)]
+                                         + [('getNodeWires', conn) for conn in sink_conns]
+                                         + [('getNodeSitePin', conn) for conn in site_conns])
+        node_wires = set(conn_outputs[0]) if conn_outputs[0] != 'NA' else set()
+        conn_wires = {conn : set(wires) if wires != 'NA' else set()
+                      for conn, wires in zip(sink_conns, conn_outputs[1:len(sink_conns) + 1])}
+        site_pins = {conn : site_pin for conn, site_pin in zip(site_conns, conn_outputs[len(sink_conns) + 1:])
+                     if site_pin and site_pin != 'NA'}
+
+        # Get the site and site tile of each connection with a site pin
+        pin_conns = list(site_pins)
+        pin_sites = self.run_commands([('getNodeSite', conn) for conn in pin_conns])
+        pin_site_tiles = self.run_commands([('getSiteTile', site) for site in pin_sites])
+        conn_sites = dict(zip(pin_conns, zip(pin_sites, pin_site_tiles)))
+
+        # Query the cells of all site tiles that haven't been queried yet in a single batch
+        self.query_tiles_cells([site_tile for site_tile in dict.fromkeys(pin_site_tiles) if site_tile not in self.cells])
+
+        # Get the sink of each of the net's pips with a source in the current node for further tracing
+        node_pip_sinks = [sink for source, sink in self.get_pips(net) if source in node_wires]
+        trace_conns = []
+
         # Trace each wire connection for initial cells used by the net in the current tile
         for conn in sink_conns:
             conn_tile, conn_node = conn.split('/')
-            conn_wires = self.run_command('getNodeWires', conn)
-            
+
             # If the connected tile is not an interconnect, check for cells
             if 'INT' not in conn_tile:
-                # Attempt to get site pin for the current node
-                site_pin = self.run_command('getNodeSitePin', conn)
-
-                # Check if a site pin was found
-                if site_pin and site_pin != 'NA':
-                    site = self.run_command('getNodeSite', conn)
-                    site_tile = self.run_command('getSiteTile', site)                
-                    # Query the cells in the tile if not already queried
-                    if site_tile not in self.cells:
-                        self.query_cells(site_tile)
-                    
-                    init_cells = set()
+                # Check if a site pin was found for the current node
+                if conn in site_pins:
+                    site_pin = site_pins[conn]
+                    site, site_tile = conn_sites[conn]
+
                     # Find any cells that are connected to the site pin
-                    for cell in self.cells[site_tile][site].values():
-                        cell_site_pins = self.run_command('getCellSitePins', cell)
+                    init_cells = self.get_site_pin_cells(site_tile, site).get(site_pin, [])
+                    affected_rsrcs.update(init_cells)
 
-                        # Identify if the node's site pin is connected to the current cell
-                        if site_pin in cell_site_pins:
-                            affected_rsrcs.add(cell)
-                            init_cells.add(cell)
+                    # Trace the site's affected cells from all of the initial cells found together
+                    if init_cells:
+                        self.trace_cells(site_tile, site, init_cells, affected_rsrcs)
 
-                    # Trace the site's affected cells from each of the initial cells found
-                    [affected_rsrcs.union(self.trace_cells(site_tile, site, cell, affected_rsrcs)) for cell in init_cells]
+            # Check each pip from the current node if its sink matches a wire from the connection and
+            # add the connection to be traced (once any earlier connections have been traced)
+            for pip_sink in node_pip_sinks:
+                if pip_sink in conn_wires[conn]:
+                    trace_conns.append(conn)
 
-            # Get routing location info for further tracing
-            node_wires = self.run_command('getNodeWires', current_node)
-            pips = self.get_pips(net)
+        # Prefetch the node and wire connections of each untraced connection in a single batch so
+        # they are already saved when the connections are traced
+        self.run_commands([prefetch_cmd for conn in dict.fromkeys(trace_conns) if conn not in traced_nodes
+                           for prefetch_cmd in (('getWireNode', conn), ('getWireConnections', *conn.split('/')))])
 
-            # Check each pip if their nodes match wires from the current node and connection
-            for pip in pips:
-                # Check if current pip nodes match wires and the node hasn't been traced yet
-                if pip[0] in node_wires and pip[1] in conn_wires and conn not in traced_nodes:
-                    affected_rsrcs, traced_nodes = self.trace_affected_resources(net, conn_tile, conn_node,
-                                                                                    traced_nodes, affected_rsrcs)
+        return trace_conns
 
-        return affected_rsrcs, traced_nodes
+    def get_site_pin_cells(self, tile:str, site:str):
+        '''
+            Gets the cells connected to each of a site's pins, querying the site pins of all the
+            site's cells in a single batch the first time the site is requested
+                Arguments: Strings of the tile and site
+                Returns: Dict of the site's pins and the list of cells connected to each
+        '''
+
+        # Map the site pins of each of the site's cells if the site hasn't been mapped yet
+        if site not in self.site_pin_cells:
+            site_cells = list(self.cells[tile][site].values())
+            all_cell_site_pins = self.run_commands([('getCellSitePins', cell) for cell in site_cells])
+
+            self.site_pin_cells[site] = {}
+            for cell, cell_site_pins in zip(site_cells, all_cell_site_pins):
+                # Skip any cells with no site pins found
+                if not cell_site_pins or cell_site_pins == 'NA':
+                    continue
+
+                for site_pin in cell_site_pins:
+                    try:
+                        self.site_pin_cells[site][site_pin].append(cell)
+                    except KeyError:
+                        self.site_pin_cells[site][site_pin] = [cell]
+
+        return self.site_pin_cells[site]
+
+    def trace_cells(self, tile:str, site:str, cells:list, affected_resources:set):
+        '''
+            Traces through the affected cells downstream of the provided cells. Downstream cells
+            are traced a level at a time rather than by recursion, with the lookups for all of
+            a level's cells (starting with all of the provided cells) sent to vivado in a batch
+            for each lookup step.
+                Arguments: Strings of the tile and site of the cells, list of the names of the
+                           cells to be traced, and the current set of affected resources found so far
+                Returns: Updated set of the affected resources found after tracing the cells
+        '''
+
+        # Start the trace from the initial cells and mark them as traced
+        traced_cells = set(cells)
+        level_cells = list(dict.fromkeys(cells))
+        cell_site = (tile, site)
+
+        # Trace each level of cells until no untraced downstream cells remain
+        while level_cells:
+            # Find all of the output pins for the level's cells, leaving out cells with none found
+            cell_outpins = self.run_lookups('getCellOutputPins', level_cells)
+            cell_outpins = {level_cell : outpins if outpins != 'NA' else [] for level_cell, outpins in cell_outpins.items()}
+
+            # Get the nets of the output pins and the cells across all aliases of each net, leaving out
+            # the global logic nets, which fan out to most of the design without passing on a fault
+            pin_nets = self.run_lookups('getPinNet', (pin for pins in cell_outpins.values() for pin in pins))
+            pin_nets = {pin : net for pin, net in pin_nets.items() if not net.endswith(VivadoQuery.CONST_NETS)}
+            net_cells = self.run_lookups('getNetAliasCells', (net for net in pin_nets.values() if net and net != 'NA'))
+
+            next_cells = []
+            for level_cell in level_cells:
+                # Keep track of the nets walked for the cell so that output pins sharing a net only walk it once
+                seen_nets = set()
+
+                for cell_outpin in cell_outpins[level_cell]:
+                    pin_net = pin_nets.get(cell_outpin)
+                    # Verify that a proper cell pin was found with cells on its net that hasn't been walked yet
+                    if not pin_net or pin_net == 'NA' or pin_net in seen_nets or net_cells[pin_net] == 'NA':
+                        continue
+                    seen_nets.add(pin_net)
+
+                    # Add cells to the affected resources and trace that cell for others
+                    for net_cell in net_cells[pin_net]:
+                        # Specify only different cells in the same tile
+                        if net_cell != level_cell and self.cell_sites.get(net_cell) == cell_site and net_cell not in affected_resources:
+                            affected_resources.add(net_cell)
+
+                            # Only trace cells that haven't been traced yet (e.g. the initial cell)
+                            if net_cell not in traced_cells:
+                                traced_cells.add(net_cell)
+                                next_cells.append(net_cell)
+
+            level_cells = next_cells
 
-    def trace_cells(self, tile:str, site:str, cell:str, affected_resources:set):
-        '''
-            Recursively traces through the affected cells downstream of the provided cell
-                Arguments: Strings of the tile, site, and name of the cell to be traced and
-                           the current set of affected resources found so far
-                Returns: Updated set of the affected resources found after tracing the cell
-        '''
-
-        # Find all of the output pins for the current cell
-        cell_outpins = [pin for pin in self.run_command('getCellPins', cell) if self.run_command('getPinDirection', pin) == 'OUT']
-        for cell_outpin in cell_outpins:
-            pin_net = self.run_command('getPinNet', cell_outpin)
-            # Verify that a proper cell pin was found
-            if not pin_net or pin_net == 'NA':
-                continue
-
-            pin_net_aliases = self.run_command('getNetAliases', pin_net)
-            # Iterate through all aliases of the net
-            for pin_net_alias in pin_net_aliases:
-                net_cells = self.run_command('getNetCells', pin_net_alias)
-
-                # Add cells to the affected resources and trace that cell for others
-                for net_cell in net_cells:
-                    # Specify only different cells in the same tile
-                    if net_cell != cell and net_cell in self.cells[tile][site].values() and net_cell not in affected_resources:
-                        affected_resources.add(net_cell)
-                        affected_resources.union(self.trace_cells(tile, site, net_cell, affected_resources))
-        
         return affected_resources
 
     def get_CLB_affected_resources(self, site: str, function: str):
@@ -859,9 +1154,7 @@ class VivadoQuery(DesignQuery):
                         affected_rsrcs.add(cell)
 
             # Trace downstream from all current affected cells
-            original_rsrcs = affected_rsrcs.copy()
-            for cell in original_rsrcs:
-                self.trace_cells(tile, site, cell, affected_rsrcs)      
+            self.trace_cells(tile, site, list(affected_rsrcs), affected_rsrcs)
 
         # Resource fetching for flip-flop control bits
         if function in FF_CONTROL:
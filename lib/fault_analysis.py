@@ -24,12 +24,20 @@
     failures that occur due to fault bits
 '''
 
-import copy
-from lib.define_bit import Bit, bit_bitstream_addr
+import re
+import sys
+from collections import defaultdict, deque
+from lib.define_bit import Bit, bit_bitstream_addrs
 from lib.design_query import DesignQuery
-from lib.tile import Tile
+from lib.tile import Tile, get_tile_type
 from lib.lut_config import LUT
 
+# Config bit value set by each type of bit upset
+UPSET_BIT_VALUES = {'1->0' : 0, '0->1' : 1}
+
+# Pattern matching each pin of a fault message section and whether it was initially connected
+FAULT_MSG_PIN = re.compile(r'([^,\s]+)( \(initially connected\))?')
+
 class FaultBit(Bit):
     '''
         Stores the information for an individual fault bit
@@ -53,10 +61,18 @@ class FaultBit(Bit):
                 failure - description of the design failure caused by the bit
 
                 note - any special notes to be recorded and printed about the bit
+
+                mux - the name of the routing mux configured by the bit (INT bits only)
     '''
 
+    __slots__ = ('type', 'design_name', 'affected_rsrcs', 'affected_pips', 'failure', 'note', 'mux')
+
+    # Default values shared by all fault bits until they are replaced with design data
+    NA_VALUES = ('NA',)
+    NO_AFFECTED_RSRCS = ('No affected resources found',)
+
     # Init from corresponding Bit object
-    def __init__(self, bit:Bit, design_bits:list, frame_list:list, design:DesignQuery):
+    def __init__(self, bit:Bit, design_bits:set, frame_list:set, design:DesignQuery):
         # Copy input Bit attributes
         self.bit = bit.bit
         self.tile = bit.tile
@@ -74,10 +90,11 @@ class FaultBit(Bit):
             self.type = 'NA'
 
         self.design_name = 'NA'
-        self.affected_rsrcs = ['NA']
-        self.affected_pips = ['NA']
+        self.affected_rsrcs = FaultBit.NA_VALUES
+        self.affected_pips = FaultBit.NA_VALUES
         self.failure = 'Fault evaluation not yet supported for this bit'
         self.note = 'NA'
+        self.mux = 'NA'
 
         # Update design name and affected resources with design data
         self.update_with_design_info(design)
@@ -87,11 +104,11 @@ class FaultBit(Bit):
     ##################################################
 
     @classmethod
-    def fromAddress(cls, bitstream_addr:str, frame_list:list, tilegrid:dict, tile_imgs:dict, design_bits:list, design:DesignQuery):
+    def fromAddress(cls, bitstream_addr:str, frame_list:set, tilegrid:dict, tile_imgs:dict, design_bits:set, design:DesignQuery):
         '''
             Initialize FaultBit from bitstream address and part information
-                Arguments: String of the bit's bitstream address, list of valid frames for the part,
-                           dicts of the tilegrid and images of the part's tiles, a list of design
+                Arguments: String of the bit's bitstream address, set of valid frames for the part,
+                           dicts of the tilegrid and images of the part's tiles, a set of design
                            bits, and a query for the design
                 Returns: Newly generated FaultBit object from the data provided
         '''
@@ -100,10 +117,10 @@ class FaultBit(Bit):
         return cls(bit, design_bits, frame_list, design)
     
     @classmethod
-    def fromBit(cls, bit:Bit, frame_list:list, design_bits:list, design:DesignQuery):
+    def fromBit(cls, bit:Bit, frame_list:set, design_bits:set, design:DesignQuery):
         '''
             Initialize FaultBit from corresponding Bit object
-                Arguments: Bit object to adapt, lists of valid frames for the part
+                Arguments: Bit object to adapt, sets of valid frames for the part
                            and design bits, and a query for the design
                 Returns: Newly generated FaultBit object from the data provided
         '''
@@ -159,7 +176,7 @@ class FaultBit(Bit):
 
             # Give default value for affected resources if no specific resources are found
             if not self.affected_rsrcs or (len(self.affected_rsrcs) <= 1 and 'NA' in self.affected_rsrcs):
-                self.affected_rsrcs = ['No affected resources found']
+                self.affected_rsrcs = FaultBit.NO_AFFECTED_RSRCS
 
     def __get_design_info_INT(self, design:DesignQuery):
         '''
@@ -168,15 +185,15 @@ class FaultBit(Bit):
         '''
 
         # Extract the name of the mux from the bit's physical function
-        mux_name = self.phys_fctns[0][0].split(' ')[0]
-        self.design_name = f'{self.tile}/{mux_name}'
+        self.mux = sys.intern(self.phys_fctns[0][0].split(' ')[0])
+        self.design_name = f'{self.tile}/{self.mux}'
 
         # Get the net that routes through the mux
-        net = design.get_net(self.tile, mux_name)
+        net = design.get_net(self.tile, self.mux)
 
         # Find the resources affected by the bit's net if it has one
         if net and net != 'NA':
-            self.affected_rsrcs = design.get_affected_rsrcs(net, self.tile, mux_name)
+            self.affected_rsrcs = design.get_affected_rsrcs(net, self.tile, self.mux)
 
     def __get_design_info_CLB(self, design:DesignQuery):
         '''
@@ -495,17 +512,19 @@ class FaultBit(Bit):
 #          Bit Group Analysis Functions          #
 ##################################################
 
-def analyze_bit_group(group_bits:list, frame_list:list, tilegrid:dict, tile_imgs:dict, design_bits:list, design:DesignQuery):
+def analyze_bit_group(group_bits:list, frame_list:set, tilegrid:dict, tile_imgs:dict, design_bits:set, design:DesignQuery):
     '''
         Analyzes the fault bits in the provided bit group in their part and design
-            Arguments: List of fault bits to be analyzed, list of valid frames for the part,
-                       dicts of the part's tilegrid and tile images, list of the design bits,
+            Arguments: List of fault bits to be analyzed, set of valid frames for the part,
+                       dicts of the part's tilegrid and tile images, set of the design bits,
                        and a query for the design's data
             Returns: Dict of the updated FaultBit objects after analysis
     '''
 
     fault_bits = {}
-    int_tiles = {}
+    int_tiles = defaultdict(list)
+    traced_tiles = {}
+    traced_nets = {}
 
     # Generate FaultBit object for each bit in group and organize by tile
     for gb in group_bits:
@@ -514,34 +533,24 @@ def analyze_bit_group(group_bits:list, frame_list:list, tilegrid:dict, tile_imgs
 
         # Add any fault bits for INT tiles a dictionary under its tile
         if 'INT_L' in fb.tile or 'INT_R' in fb.tile:
-            # Create a new entry for tile if needed and add new bit to the tile's entry
-            try:
-                int_tiles[fb.tile].append(fb)
-            except KeyError:
-                int_tiles[fb.tile] = []
-                int_tiles[fb.tile].append(fb)
+            int_tiles[fb.tile].append(fb)
         
         # Add the bit to the collection of fault bits
-        fault_bits[fb.bit] = copy.deepcopy(fb)
-        del fb
+        fault_bits[fb.bit] = fb
 
     # Evaluate the fault bits in each tile affected by bit group
     for tile in int_tiles:
-        tile_obj = copy.deepcopy(tile_imgs[tile[:tile.find('_X')]])
-        tile_obj.name = tile
-        affected_muxes = set()
+        tile_obj = tile_imgs[get_tile_type(tile)].clone(tile)
 
-        # Add each affected routing mux to a list
-        for tb in int_tiles[tile]:
-            mux_name = tb.phys_fctns[0][0].split(' ')[0]
-            affected_muxes.add(mux_name)
+        # Add each affected routing mux to a set
+        affected_muxes = {tb.mux for tb in int_tiles[tile]}
 
-        # Set config bits in each routing mux to their values from the design
-        for mux in affected_muxes:
-            tile_obj = set_mux_config(tile_obj, mux, tilegrid, design_bits)
+        # Set config bits in the affected routing muxes to their values from the design
+        tile_obj = set_mux_config(tile_obj, affected_muxes, tilegrid, design_bits)
 
         # Evaluate fault errors in current tile
-        tile_report = eval_INT_tile(tile_obj, affected_muxes, int_tiles, design_bits, tilegrid, design)
+        tile_report = eval_INT_tile(tile_obj, affected_muxes, int_tiles, design_bits, tilegrid,
+                                    tile_imgs, traced_tiles, traced_nets, design)
 
         # Set corresponding fault descriptions & affected pips of each of the tile's fault bits
         for tb in tile_report:
@@ -551,28 +560,21 @@ def analyze_bit_group(group_bits:list, frame_list:list, tilegrid:dict, tile_imgs
     
     return fault_bits
 
-def set_mux_config(tile:Tile, mux:str, tilegrid:dict, design_bits:list):
+def set_mux_config(tile:Tile, muxes:set, tilegrid:dict, design_bits:set):
     '''
-        Sets the values of the mux's configuration bits to the values they are given
+        Sets the values of the muxes' configuration bits to the values they are given
         in the provided design
-            Arguments: Tile object to update, string of the mux to update, dict of the
-                       part's tilegrid, and a list of the high bits in the design
+            Arguments: Tile object to update, set of the muxes to update, dict of the
+                       part's tilegrid, and a set of the high bits in the design
             Returns: Updated Tile object
     '''
 
-    # Set each config bit in each PIP in the current routing mux to its original value
-    for src in tile.pips[mux]:
-        # Get bit tile addresses used in the current pip
-        pip_bits = [bit.replace('!', '') for bit in tile.pips[mux][src]]
+    # Get bit tile addresses used in each PIP of the routing muxes in one flat set
+    pip_bits = set().union(*(src_bits for mux in muxes for src_bits in tile.pip_bit_addrs[mux].values()))
 
-        # Set each config bit in the PIP to its original value
-        for pip_bit in pip_bits:
-            # Convert the bit tile address to its bitstream address
-            bitstream_addr = bit_bitstream_addr([tile.name, pip_bit, 0], tilegrid)
-
-            # Set the current PIP bit's value to be 1 if it is in the design bits
-            if bitstream_addr in design_bits:
-                tile.change_bit(pip_bit, 1)
+    # Set each PIP config bit's value to be 1 if its bitstream address is in the design bits
+    bitstream_addrs = bit_bitstream_addrs(tile.name, pip_bits, tilegrid)
+    tile.config_bits.update({bit : 1 for bit, addr in bitstream_addrs.items() if addr in design_bits})
 
     return tile
 
@@ -620,6 +622,28 @@ def get_global_site(local_site:str, tile:str, design:DesignQuery):
             Returns: String of the converted site name 
     '''
 
+    # Return the previously found site if this site name has been converted for the tile
+    try:
+        return design.global_sites[tile][local_site]
+    except KeyError:
+        global_site = find_global_site(local_site, tile, design)
+
+    # Save the converted site for any later fault bits in the same tile
+    try:
+        design.global_sites[tile][local_site] = global_site
+    except KeyError:
+        design.global_sites[tile] = {local_site : global_site}
+
+    return global_site
+
+def find_global_site(local_site:str, tile:str, design:DesignQuery):
+    '''
+        Searches the design's sites in a tile for the site matching an offset site name
+            Arguments: String of site name from Project X-Ray database, string of tile name,
+                       design query object
+            Returns: String of the converted site name
+    '''
+
     # Separate and identify the resource's root and offset if possible
     try:
         site_root, site_offset = local_site.split('_')
@@ -640,31 +664,14 @@ def get_global_site(local_site:str, tile:str, design:DesignQuery):
         # Add all sites matching the root to a list
         sites = [site for site in design.cells[tile] if site_root in site]
 
-        # Check for a matching site based off of the Y offset
-        if 'Y' in site_offset:
-            # Set the site's y offset
-            if '1' in site_offset:
-                y_off = 1
-            else:
-                y_off = 0
-
-            # Sort the sites by their y address and return the one that matches
-            # the given offset
-            sites = sorted(sites, key=lambda s: int(s[(s.find('Y') + 1):]))
-            return sites[y_off]
-
-        # Check for a matching site based off of the X offset
-        elif 'X' in site_offset:
-            # Set the site's y offset
-            if '1' in site_offset:
-                x_off = 1
-            else:
-                x_off = 0
-            
-            # Sort the sites by their y address and return the one that matches
-            # the given offset
-            sites = sorted(sites, key=lambda s: int(s[(s.find('X') + 1):s.find('Y')]))
-            return sites[x_off]
+        # Check for a matching site based off of the Y or X offset
+        if 'Y' in site_offset or 'X' in site_offset:
+            axis = 'Y' if 'Y' in site_offset else 'X'
+
+            # Sort the sites by their address along the offset's axis and return the one
+            # that matches the given offset
+            sites = sorted(sites, key=lambda s: get_site_coord(s, axis))
+            return sites[1 if '1' in site_offset else 0]
 
         # Handling for if no offset is given
         elif len(sites) == 1:
@@ -672,6 +679,17 @@ def get_global_site(local_site:str, tile:str, design:DesignQuery):
 
     return 'NA'
 
+def get_site_coord(site:str, axis:str):
+    '''
+        Gets the X or Y coordinate from a site's name
+            Arguments: String of the site's name and string of the axis ('X' or 'Y')
+            Returns: Int of the site's coordinate along the axis
+    '''
+
+    if axis == 'Y':
+        return int(site[(site.find('Y') + 1):])
+    return int(site[(site.find('X') + 1):site.find('Y')])
+
 def get_site_related_cells(tile:str, site:str, bel:str, design:DesignQuery):
     '''
         Finds the related cell(s) from the design in the provided site and bel
@@ -680,25 +698,54 @@ def get_site_related_cells(tile:str, site:str, bel:str, design:DesignQuery):
             Returns: String of the related cell(s)
     '''
 
-    rel_cells = [c for b, c in design.cells[tile][site].items() if bel in [b, f'{b[0]}{b[2:]}']]
+    # Index the site's cells by BEL name if it hasn't been done yet
+    try:
+        bel_cells = design.site_bel_cells[tile][site]
+    except KeyError:
+        bel_cells = index_site_cells(tile, site, design)
 
     # Return cell(s) found or 'NA' if none found
-    if rel_cells:
-        return ', '.join(sorted(rel_cells))
-    else:
-        return 'NA'
+    return bel_cells.get(bel, 'NA')
+
+def index_site_cells(tile:str, site:str, design:DesignQuery):
+    '''
+        Indexes the cells in a site by the full and shortened names of their BELs (i.e. the
+        cell in the A6LUT BEL is related to both A6LUT and ALUT)
+            Arguments: Strings of the tile and site to index and a query for the design's data
+            Returns: Dict of the comma separated string of related cells for each BEL name
+    '''
+
+    # Group the cells under each name of their BEL
+    rel_cells = {}
+    for b, c in design.cells[tile][site].items():
+        for bel in {b, f'{b[0]}{b[2:]}'}:
+            try:
+                rel_cells[bel].append(c)
+            except KeyError:
+                rel_cells[bel] = [c]
+
+    bel_cells = {bel : ', '.join(sorted(cells)) for bel, cells in rel_cells.items()}
+
+    # Save the index for any later fault bits in the same site
+    try:
+        design.site_bel_cells[tile][site] = bel_cells
+    except KeyError:
+        design.site_bel_cells[tile] = {site : bel_cells}
+
+    return bel_cells
 
 ##################################################
 #       INT Tile Fault Analysis Functions        #
 ##################################################
 
-def eval_INT_tile(tile:Tile, muxes:set, int_fault_bits:dict, design_bits:list, tilegrid:dict, design:DesignQuery):
+def eval_INT_tile(tile:Tile, muxes:set, int_fault_bits:dict, design_bits:set, tilegrid:dict, tile_imgs:dict, traced_tiles:dict, traced_nets:dict, design:DesignQuery):
     '''
         Evaluates a given tile associated with fault bits, determines any fault errors and
         the fault bits that caused them, and finds affected pips for the fault
             Arguments: Tile object for current tile, list of routing muxes affected by fault bits,
-                       dicts of all fault bits in the tile, list of all high bits, the part's
-                       tilegrid, and a query for the design data
+                       dicts of all fault bits in the tile, set of all high bits, dicts of the
+                       part's tilegrid, tile images, and tiles and nets already found by net
+                       traces, and a query for the design data
             Returns: Dict storing fault bit information for the tile
     '''
 
@@ -706,26 +753,27 @@ def eval_INT_tile(tile:Tile, muxes:set, int_fault_bits:dict, design_bits:list, t
     init_cnctd_srcs = {}
     tile_fault_bits = int_fault_bits[tile.name]
 
+    # Group the tile's fault bits by the routing mux they are associated with
+    mux_fault_bits = defaultdict(list)
+    for fb in tile_fault_bits:
+        mux_fault_bits[fb.mux].append(fb)
+
     # Get the connected sources for each routing mux in the tile before bit upsets
     for mux in muxes:
         init_cnctd_srcs[mux] = get_connected_srcs(tile, mux, design)
 
     # Iterate through each of the fault bits and implement the bit upsets
-    [tile.change_bit(fb.addr, {'1->0':0, '0->1':1}.get(fb.type)) for fb in tile_fault_bits]
+    tile.config_bits.update({fb.addr : UPSET_BIT_VALUES.get(fb.type) for fb in tile_fault_bits})
 
     # Get the connected sources for each mux after bit upsets are applied and evalute changes made
     for mux in muxes:
         fault_cnctd_srcs = get_connected_srcs(tile, mux, design)
 
-        open_srcs = set()
-        short_srcs = set()
-
         # Add any initial sources that aren't connected post-faults to the open sources
-        {open_srcs.add(src) for src in init_cnctd_srcs[mux] if src not in fault_cnctd_srcs}
+        open_srcs = init_cnctd_srcs[mux] - fault_cnctd_srcs
 
         # Add sources connected post-fault to the short sources if multiple sources found
-        if len(fault_cnctd_srcs) > 1:
-            short_srcs = fault_cnctd_srcs
+        short_srcs = fault_cnctd_srcs if len(fault_cnctd_srcs) > 1 else set()
 
         # Determine the original source connected to the sink
         short_srcs_copy = short_srcs.copy()
@@ -754,16 +802,14 @@ def eval_INT_tile(tile:Tile, muxes:set, int_fault_bits:dict, design_bits:list, t
         
         # Substitute pin/node names with corresponding net names or set to default
         if fault_desc:
-            fault_desc = sub_pins_with_nets(fault_desc, tile.name, int_fault_bits, tilegrid, design_bits, design)
+            fault_desc = sub_pins_with_nets(fault_desc, tile.name, int_fault_bits, tilegrid, tile_imgs,
+                                            traced_tiles, traced_nets, design_bits, design)
         else:
             fault_desc = 'Not able to find any failures caused by this fault'
 
-        # Apply the generated fault message to each related fault bit
-        for bit in tile_fault_bits:
-            # Check if each fault bit is associated with the current routing mux before
-            # applying the fault message
-            if mux in bit.phys_fctns[0][0]:
-                tile_report[bit.bit] = [fault_desc, mux_affected_pips[bit.bit]]
+        # Apply the generated fault message to each fault bit associated with the routing mux
+        for bit in mux_fault_bits[mux]:
+            tile_report[bit.bit] = [fault_desc, mux_affected_pips[bit.bit]]
 
     return tile_report
 
@@ -776,36 +822,19 @@ def get_connected_srcs(tile:Tile, sink_nd:str, design:DesignQuery):
             Returns: Set of all connected source nodes
     '''
 
-    connected_srcs = set()
-
-    # Iterate through each source node of the current routing mux
-    for src_nd in tile.pips[sink_nd]:
-        # Iterate through and check the bit configuration for each config bit
-        connected = True
-        for pip_bit in tile.pips[sink_nd][src_nd]:
-            # Set connected flag to false if any config bit value does not match configuration
-            if pip_bit[0] == '!' and tile.config_bits[pip_bit[1:]] != 0:
-                connected = False
-                break
-            elif pip_bit[0] != '!' and tile.config_bits[pip_bit] != 1:
-                connected = False
-                break
-
-        # If connected flag remains true add it to the list of connected sources
-        if connected:
-            connected_srcs.add(src_nd)
+    # Add each source whose pip bit rules are all met to the connected sources
+    connected_srcs = set(tile.resources[sink_nd].get_active_srcs(tile.config_bits))
 
     # Check if the sink node actually connects to VCC or GND
     if sink_nd in tile.pseudo_pips:
+        # Get the set of the mux's row and column bits
+        mux_bits = tile.resources[sink_nd].mux_bits
+
         # Iterate through each source node of the current sink node in the special pips dictionary
         for src_nd in tile.pseudo_pips[sink_nd]:
             # If the pip is marked as "default", make sure all config bits for the mux are off
             if tile.pseudo_pips[sink_nd][src_nd] == 'default':
-                # Gather related bits to the mux in a set and make sure all bits are off
-                col_bits = set(tile.resources[sink_nd].col_bits)
-                row_bits = set(tile.resources[sink_nd].row_bits)
-                mux_bits = col_bits.union(row_bits)
-                all_bits_are_off = all([tile.config_bits[bit] == 0 for bit in mux_bits])
+                all_bits_are_off = all(tile.config_bits[bit] == 0 for bit in mux_bits)
                 
                 # Check if sink and source nodes have the same net routed through them
                 try:
@@ -851,12 +880,8 @@ def get_affected_pips(tile_fault_bits, mux:str, opened_srcs:set, shorted_srcs:se
             if src == 'VCC_WIRE' or src == 'GND_WIRE':
                 # Determine whether any of the fault bits are related to the routing mux
                 for f_bit in tile_fault_bits:
-                    # Check if the bit is either a row or column bit for the routing mux
-                    is_row_bit = f_bit.addr in gen_tile.resources[mux].row_bits
-                    is_col_bit = f_bit.addr in gen_tile.resources[mux].col_bits
-                    
                     # If current bit is row or column bit for mux, this is an affected pip
-                    if is_row_bit or is_col_bit:
+                    if f_bit.addr in gen_tile.resources[mux].mux_bits:
                         # Add pip to the dictionary for the bit if a pip is found
                         if 'NA' in affected_pips[f_bit.bit]:
                             affected_pips[f_bit.bit] = [f'{src}{separator}{mux} ({src_type})']
@@ -865,7 +890,7 @@ def get_affected_pips(tile_fault_bits, mux:str, opened_srcs:set, shorted_srcs:se
                         
             else:
                 # Get all related bits to the pip, independent of their required value
-                pip_bits = [bit.replace('!', '') for bit in gen_tile.pips[mux][src]]
+                pip_bits = gen_tile.pip_bit_addrs[mux][src]
 
                 # Determine which fault bits are part of the pip rule
                 for f_bit in tile_fault_bits:
@@ -883,11 +908,12 @@ def get_affected_pips(tile_fault_bits, mux:str, opened_srcs:set, shorted_srcs:se
 
     return affected_pips
 
-def sub_pins_with_nets(msg:str, tile:str, fault_bits:dict, tilegrid:dict, design_bits:list, design:DesignQuery):
+def sub_pins_with_nets(msg:str, tile:str, fault_bits:dict, tilegrid:dict, tile_imgs:dict, traced_tiles:dict, traced_nets:dict, design_bits:set, design:DesignQuery):
     '''
         Replace each pin in the given fault message with its corresponding net(s)
             Arguments: Strings of message to be edited and tile name, dicts of the
-                       fault bits and the part's tilegrid, list of the design bits,
+                       fault bits, the part's tilegrid and tile images, and the tiles
+                       and nets already found by net traces, set of the design bits,
                        and a query for the design's data
             Returns: String of edited fault message with net names instead of pin names
     '''
@@ -902,9 +928,9 @@ def sub_pins_with_nets(msg:str, tile:str, fault_bits:dict, tilegrid:dict, design
         indirect_pins = set()
 
         # Get nets for pins from design
-        for p in pins.split(', '):
-            pin = p.split()[0]
-            is_init_cnctn = '(initially connected)' in p
+        for pin_match in FAULT_MSG_PIN.finditer(pins):
+            p = pin_match.group(0)
+            pin, is_init_cnctn = pin_match.group(1, 2)
 
             net = design.get_net(tile, pin)
 
@@ -918,7 +944,8 @@ def sub_pins_with_nets(msg:str, tile:str, fault_bits:dict, tilegrid:dict, design
 
         # Trace indirect pins for potential connected nets
         for idp in indirect_pins:
-            conn_nets = find_connected_net(tile, idp, fault_bits, design_bits, tilegrid, design)
+            conn_nets = find_connected_net(tile, idp, fault_bits, design_bits, tilegrid, tile_imgs,
+                                           traced_tiles, traced_nets, design)
             
             # Remove any nets already found from the connected nets found
             rem_nets = {cn for cn in conn_nets if cn in sec_nets or f'{cn} (initially connected)' in sec_nets}
@@ -939,96 +966,92 @@ def sub_pins_with_nets(msg:str, tile:str, fault_bits:dict, tilegrid:dict, design
 #             Net Tracing Functions              #
 ##################################################
 
-def find_connected_net(tile_name:str, node:str, fault_bits:dict, design_bits:list, tilegrid:dict, design:DesignQuery):
+def find_connected_net(tile_name:str, node:str, fault_bits:dict, design_bits:set, tilegrid:dict, tile_imgs:dict, traced_tiles:dict, traced_nets:dict, design:DesignQuery):
     '''
-        Wrapper function for the recursive trace_node_connection. Evaluates post-fault design
+        Wrapper function for trace_node_connections. Evaluates post-fault design
         to find any nets that could be connected to the given node.
-            Arguments: Strings of the initial tile and node, list of design bits, dicts of the
-                       fault bits and the part's tilegrid, and a query for the design's data
+            Arguments: Strings of the initial tile and node, set of design bits, dicts of the
+                       fault bits, the part's tilegrid and tile images, and the tiles evaluated
+                       and nets found by previous traces of the bit group, and a query for the
+                       design's data
             Returns: Set of strings of net connected to the requested node
     '''
 
-    tile_collection = {}
-    traced_nodes = set()
-    found_nets = trace_node_connections(tile_name, node, fault_bits, design_bits,
-                                        tilegrid, tile_collection, design, traced_nodes)
+    # Trace the node if it hasn't been traced yet for the bit group
+    if (tile_name, node) not in traced_nets:
+        traced_nodes = set()
+        found_nets = trace_node_connections(tile_name, node, fault_bits, design_bits, tilegrid,
+                                            tile_imgs, traced_tiles, design, traced_nodes)
+        traced_nets[(tile_name, node)] = frozenset(found_nets)
 
-    return found_nets
+    return set(traced_nets[(tile_name, node)])
 
-def trace_node_connections(tile_name:str, node:str, fault_bits:dict, design_bits:list, tilegrid:dict, tile_collection:dict, design:DesignQuery, traced_nodes:set):
+def trace_node_connections(tile_name:str, node:str, fault_bits:dict, design_bits:set, tilegrid:dict, tile_imgs:dict, tile_collection:dict, design:DesignQuery, traced_nodes:set):
     '''
-        Recursively traces back through the node connections and board wires to verify if any
-        nets are connected to the given node after SBU's are applied to the design.
-            Arguments: Strings of the tile and node; list of the design bits; dicts for the fault
-                       bits, the part's tilegrid, and the tiles already evaluated for this trace;
+        Traces back through the node connections and board wires to verify if any nets
+        are connected to the given node after SBU's are applied to the design. INT wire
+        connections are followed through a work queue rather than by recursion.
+            Arguments: Strings of the tile and node; set of the design bits; dicts for the fault
+                       bits, the part's tilegrid and tile images, and the tiles already evaluated;
                        and a query for the design's data, set of traced nodes
             Returns: Set of strings of nets connected to the requested node
     '''
 
-    # Add the current node to the set of traced nodes
-    traced_nodes.add(f'{tile_name}/{node}')
-
-    # Create and load a new tile object and save it if it hasn't been run yet
-    try:
-        tile = tile_collection[tile_name]
-    except KeyError:
-        tile_type = tile_name[:tile_name.find('_X')]
-        tile = Tile(tile_name, tile_type, design.part)
-
-        # Update tile config bits
-        [tile.change_bit(bit, 1) for bit in tile.config_bits if bit_bitstream_addr([tile_name, bit, 0], tilegrid) in design_bits]
-
-        # Check if there are any fault bits in the current tile
-        if tile_name in fault_bits:
-            # Apply changes from each fault bit
-            for f_bit in fault_bits[tile_name]:
-                # Invert the value for the fault bit if it is in the tile
-                if f_bit.addr in tile.config_bits:
-                    tile.change_bit(f_bit.addr, {0:1, 1:0}.get(tile.config_bits[f_bit.addr]))
-
-        tile.eval_connections()
-        tile_collection[tile_name] = tile
-
-    connected_nodes = []
-
-    # Determine if the node is a sink or src in a tile connection and get its connected nodes
-    if node in tile.cnxs:
-        connected_nodes.extend(tile.cnxs[node])
-    else:
-        # Check each source node with connections for the given node
-        for src in tile.cnxs:
-            # Add each sink that isn't the original node to the list if the node is a sink
-            if node in tile.cnxs[src]:
-                [connected_nodes.append(sink) for sink in tile.cnxs[src] if sink != node]
-
-    # Remove targeted node from list
-    if node in connected_nodes:
-        connected_nodes.remove(node)
-
     found_nets = set()
-    # Check each connected node for an associated net
-    for connected_node in connected_nodes:
-        found_net = design.get_net(tile_name, connected_node)
+    checked_nodes = set()
 
-        # Add the net if found, or rerun the trace on INT connections to the current node
-        if found_net != 'NA':
-            found_nets.add(found_net)
+    # Add the initial node to the set of traced nodes and queue it to be traced
+    traced_nodes.add(f'{tile_name}/{node}')
+    trace_queue = deque([(tile_name, node)])
+
+    # Trace each queued node until no untraced INT connections remain
+    while trace_queue:
+        tile_name, node = trace_queue.popleft()
+
+        # Create and load a new tile object and save it if it hasn't been run yet
+        tile = tile_collection.get(tile_name)
+        if tile is None:
+            tile = tile_imgs[get_tile_type(tile_name)].clone(tile_name)
+
+            # Update tile config bits
+            bitstream_addrs = bit_bitstream_addrs(tile_name, tile.config_bits, tilegrid)
+            tile.config_bits.update({bit : 1 for bit, addr in bitstream_addrs.items() if addr in design_bits})
+
+            # Check if there are any fault bits in the current tile
+            if tile_name in fault_bits:
+                # Apply changes from each fault bit
+                for f_bit in fault_bits[tile_name]:
+                    # Invert the value for the fault bit if it is in the tile
+                    if f_bit.addr in tile.config_bits:
+                        tile.change_bit(f_bit.addr, 1 - tile.config_bits[f_bit.addr])
+
+            tile.eval_connections()
+            tile_collection[tile_name] = tile
+
+        # Determine if the node is a sink or src in a tile connection and get its connected
+        # nodes, leaving out the targeted node itself
+        if node in tile.cnxs:
+            connected_nodes = {sink for sink in tile.cnxs[node] if sink != node}
         else:
-            wire_cnxs = design.get_wire_connections(tile_name, connected_node)
-            non_int_cnxs = set()
-
-            # Save non-INT connections in a separate set and remove each from the original list
-            [non_int_cnxs.add(cnx) for cnx in wire_cnxs if 'INT' not in cnx]
-            [wire_cnxs.remove(nic) for nic in non_int_cnxs]
-
-            # Trace the node at the end of each wire connection
-            for wire_cnx in wire_cnxs:
-                wire_tile, wire_node = wire_cnx.split('/')
-
-                # Do not trace previously traced nodes
-                if wire_cnx not in traced_nodes:
-                    found_nets.update(trace_node_connections(wire_tile, wire_node, fault_bits,
-                                                            design_bits, tilegrid,
-                                                            tile_collection, design, traced_nodes))
+            # Get the other sinks driven by each of the node's sources if the node is a sink
+            connected_nodes = {sink for src in tile.rev_cnxs.get(node, ()) for sink in tile.cnxs[src] if sink != node}
+
+        # Check each connected node for an associated net, skipping nodes already checked in this
+        # trace since their net or wire connections have already been handled
+        for connected_node in connected_nodes:
+            if (tile_name, connected_node) in checked_nodes:
+                continue
+            checked_nodes.add((tile_name, connected_node))
+            found_net = design.get_net(tile_name, connected_node)
+
+            # Add the net if found, or queue a trace of the INT connections to the current node
+            if found_net != 'NA':
+                found_nets.add(found_net)
+            else:
+                # Queue the node at the end of each INT wire connection that hasn't been traced
+                for wire_cnx in design.get_wire_connections(tile_name, connected_node):
+                    if 'INT' in wire_cnx and wire_cnx not in traced_nodes:
+                        traced_nodes.add(wire_cnx)
+                        trace_queue.append(wire_cnx.split('/'))
 
     return found_nets
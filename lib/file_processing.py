@@ -25,6 +25,7 @@
 '''
 
 import json
+import sys
 from lib.tile import get_xray_dir
 
 #####################################################
@@ -58,7 +59,7 @@ def parse_tilegrid(part:str):
             # Get tile name from first line of tile scope
             if start_tile:
                 tile_name = line.strip().split(':')[0]
-                tile_name = tile_name[1:-1]
+                tile_name = sys.intern(tile_name[1:-1])
                 start_tile = False
             
             # Raise start_tile flag on first line
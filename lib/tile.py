@@ -24,6 +24,10 @@
     used in tiles and any corresponding resources in designs given to BFAT
 '''
 
+import copy
+import sys
+from functools import lru_cache
+from operator import itemgetter
 from os.path import exists
 
 class Tile:
@@ -51,6 +55,28 @@ class Tile:
 
                 cnxs (INT specific) - dictionary of the connections formed through activated
                                       pips in the INT switchbox
+
+                rev_cnxs (INT specific) - reverse index of cnxs mapping each connected sink to
+                                          the sources driving it
+
+                is_int - whether the tile is an INT switchbox tile
+
+                is_bram - whether the tile is a BRAM tile
+
+                pip_bit_addrs (INT specific) - dictionary of the addresses of the configuration
+                                               bits used by each pip, independent of their
+                                               required values
+
+                bit_fctns - dictionary mapping each configuration bit in the tile to the
+                            functions of the resources that it configures
+
+                init_bit_fctns (BRAM specific) - dictionary mapping each BRAM initialization bit
+                                                 to the functions of the resources it initializes
+
+                config_bit_keys - set of the tile's configuration bit addresses packed as ints
+
+                init_bit_keys (BRAM specific) - set of the tile's BRAM initialization bit addresses
+                                                packed as ints
     '''
 
     def __init__(self, tile_name:str, tile_type:str, part:str):
@@ -59,25 +85,85 @@ class Tile:
         self.resources = {}         # {resource : [bit_config]}
         self.config_bits = {}       # {bit_addr : bit_value}
         self.nets = {}              # {node : net}
+        self.bit_fctns = {}         # {bit_addr : [function]}
+        self.is_int = self.type in ('INT_L', 'INT_R')
+        self.is_bram = self.type in ('BRAM_L', 'BRAM_R')
 
         # Interconnect-specific Variables and Population (Possible pips and Connections formed)
-        if self.type in ('INT_L', 'INT_R'):
+        if self.is_int:
             self.pips = {}          # {sink : {src : [bit_config]}}
             self.pseudo_pips = {}   # {sink : {src : config_type}}
             self.cnxs = {}          # {src : [sinks]}
+            self.rev_cnxs = {}      # {sink : [srcs]}
             self.populate_tile(part)
             self.resources.update({sink : RTMux(sink, self.pips[sink]) for sink in self.pips})
 
+            # Index the bits used by each pip independent of their required values
+            self.pip_bit_addrs = {}     # {sink : {src : {bit_addr}}}
+            for sink, srcs in self.pips.items():
+                self.pip_bit_addrs[sink] = {src : frozenset(bit.replace('!', '') for bit in bits) for src, bits in srcs.items()}
+
         # BRAM-specific variables (BRAM initialization bits)
-        if self.type in ('BRAM_L', 'BRAM_R'):
+        elif self.is_bram:
             self.init_resources = {}    # {resource : bit_config}
             self.init_bits = {}         # {bit_addr : bit_value}
+            self.init_bit_fctns = {}    # {bit_addr : [function]}
             self.populate_tile(part)
 
         # Generic Population
         else:
             self.populate_tile(part)
 
+        self.index_bit_functions()
+
+        # Pack the bit addresses into int keys so bitstream bits can be checked without formatting
+        self.config_bit_keys = pack_tile_addrs(self.config_bits)
+        if self.is_bram:
+            self.init_bit_keys = pack_tile_addrs(self.init_bits)
+
+    def index_bit_functions(self):
+        '''
+            Maps each of the tile's configuration bits to the functions of the resources it is
+            used in so that the function of a bit can be found with a single lookup
+        '''
+
+        # Map INT bits to the first routing mux using them as a row or column bit
+        if self.is_int:
+            for mux_name, mux in self.resources.items():
+                mux_str = f'{mux_name} {mux.mux_type} Routing Mux'
+                for row_bit in mux.row_bits:
+                    self.bit_fctns.setdefault(row_bit, [[mux_str, 'Row Bit']])
+                for col_bit in mux.col_bits:
+                    self.bit_fctns.setdefault(col_bit, [[mux_str, 'Column Bit']])
+            return
+
+        # Map each bit to every resource function that uses it, independent of its required value
+        for rsrc, rsrc_bits in self.resources.items():
+            fctn = [sys.intern(fctn_part) for fctn_part in rsrc.split('.')]
+            for bit in dict.fromkeys(rsrc_bit.replace('!', '') for rsrc_bit in rsrc_bits):
+                self.bit_fctns.setdefault(bit, []).append(fctn)
+
+        # Map BRAM initialization bits to the resources they initialize
+        if self.is_bram:
+            for rsrc, init_bit in self.init_resources.items():
+                init_fctn = [sys.intern(fctn_part) for fctn_part in rsrc.split('.')]
+                self.init_bit_fctns.setdefault(init_bit, []).append(init_fctn)
+
+    def get_bit_fctns(self, bit_addr:str, data_index:int):
+        '''
+            Gets the functions of the resources using one of the tile's bits
+                Arguments: String of the bit's tile address and int of the tilegrid data index
+                           the bit was found at
+                Returns: List of the functions (lists of strings) of the resources using the bit
+        '''
+
+        # Seperate association of BRAM data initialization bits from other bits
+        if self.is_bram and data_index == 0:
+            return self.init_bit_fctns.get(bit_addr, [])
+
+        # Standard bit resource association (routing mux row/column bits for INT tiles)
+        return self.bit_fctns.get(bit_addr, [])
+
     def model_tile(self):
         '''
             Models all used routing mux from a single tile from the design
@@ -170,6 +256,21 @@ class Tile:
             first_ln = False
             print('\t' + line, end='')
 
+    def clone(self, tile_name:str):
+        '''
+            Creates a copy of the tile for the given tile name. The copy shares the tile type's
+            resource and pip definitions and only gets its own config bit values.
+                Arguments: String of the new tile's name
+                Returns: Tile object copied from this tile
+        '''
+
+        tile = copy.copy(self)
+        tile.name = tile_name
+        tile.config_bits = self.config_bits.copy()
+        tile.nets = {}
+
+        return tile
+
     def change_bit(self, bit:str, value:int):
         '''
             Changes selected config bit to have the given value
@@ -181,37 +282,30 @@ class Tile:
     def eval_connections(self):
         '''
             Evaluates pip rules and current config bit values to find any connections formed in
-            the tile and updates the cnxs class field.
+            the tile and updates the cnxs and rev_cnxs class fields.
         '''
 
         updated_cnxs = {}
+        updated_rev_cnxs = {}
 
         # Evaluate the pip connections for each routing mux in the tile
         for mux in self.pips:
-            # Evaluate the bit rules for each pip connected to the current routing mux
-            for src in self.pips[mux]:
-                connected = True
-                # Evaluate each bit_rule for the current pip to find if anything doesn't match
-                for bit_rule in self.pips[mux][src]:
-                    # Check that the config bit value matches the values specified by its rule
-                    if bit_rule[0] == '!':
-                        # Check any low rules for the bit inside the rule
-                        if self.config_bits[bit_rule[1:]] != 0:
-                            connected = False
-                            break
-                    elif self.config_bits[bit_rule] != 1:
-                        connected = False
-                        break
-                
-                # Add the source and mux to the dictionary if everything matched for this rule
-                if connected:
-                    # Create a dictionary entry if there isn't one and add the source and sink
-                    try:
-                        updated_cnxs[src].append(mux)
-                    except KeyError:
-                        updated_cnxs[src] = [mux]
-        
+            # Add each source whose bit rules all match to the connections of the mux
+            for src in self.resources[mux].get_active_srcs(self.config_bits):
+                # Create a dictionary entry if there isn't one and add the source and sink
+                try:
+                    updated_cnxs[src].append(mux)
+                except KeyError:
+                    updated_cnxs[src] = [mux]
+
+                # Record the reverse connection for looking up the sources of a sink
+                try:
+                    updated_rev_cnxs[mux].append(src)
+                except KeyError:
+                    updated_rev_cnxs[mux] = [src]
+
         self.cnxs = updated_cnxs
+        self.rev_cnxs = updated_rev_cnxs
 
     def populate_tile(self, part:str):
         '''
@@ -248,7 +342,7 @@ class Tile:
                         self.config_bits[cfgb.replace('!','')] = 0
 
                     # Interconnect tile population
-                    if self.type in ('INT_L', 'INT_R'):
+                    if self.is_int:
                         sink = header[1]
                         # Get the name of the source pin from the line
                         if len(header) > 2:
@@ -278,7 +372,7 @@ class Tile:
         
 
         # Add BRAM initialization bit addresses if the tile is a BRAM
-        if self.type in ('BRAM_L', 'BRAM_R'):
+        if self.is_bram:
             segbits_BRAM_path = f'{get_xray_dir()}/{arch}/segbits_{self.type.lower()}.block_ram.db'
 
             # Make sure that the segbits file for this tile type exists
@@ -309,7 +403,7 @@ class Tile:
 
 
         # Add default/always active pips from ppips file if the tile is an interconnect
-        if self.type in ('INT_L', 'INT_R'):
+        if self.is_int:
             ppips_path = f'{get_xray_dir()}/{arch}/ppips_{self.type.lower()}.db'
 
             # Make sure that the ppips file for this tile type exists
@@ -346,6 +440,17 @@ class RTMux:
                 row_bits - list of the row bits used by the routing mux
 
                 col_bits - list of the column bits used by the routing mux
+
+                mux_bits - set of all the row and column bits used by the routing mux
+
+                bit_order - list of the configuration bits used by the routing mux in the order
+                            of their positions in the pip masks
+
+                pip_masks - dictionary of the bits each source's pip requires to be high and low,
+                            packed as bitmasks over the positions in bit_order
+
+                bit_getter - getter returning the values of the bits in bit_order from a tile's
+                             config bits in a single call (for muxes with multiple bits)
     '''
 
     def __init__(self, sink_nd:str, pips:dict):
@@ -353,7 +458,11 @@ class RTMux:
         self.mux_type = ''
         self.row_bits = []
         self.col_bits = []
+        self.bit_order = []
+        self.pip_masks = {}         # {src : (high_mask, low_mask)}
         self.gen_mux(pips)
+        self.mux_bits = frozenset(self.row_bits + self.col_bits)
+        self.gen_pip_masks(pips)
 
     def def_mux_type(self, num_srcs:int):
         '''
@@ -416,6 +525,82 @@ class RTMux:
                 print('Unrecognized number of inclusions (' + str(cfg_bit_cnt[cfgb])
                       + ') in routing mux for ' + cfgb)
 
+    def gen_pip_masks(self, pips:dict):
+        '''
+            Packs the bit rules of each of the mux's pips into bitmasks of the bits that must
+            be high and the bits that must be low for the pip to be connected
+                Arguments: Dict of the pips in the tile that have this mux as the sink node
+        '''
+
+        bit_pos = {}
+
+        # Give each config bit of the mux a position and set it in the source's masks
+        for src, pip_bits in pips.items():
+            high_mask = 0
+            low_mask = 0
+            for pip_bit in pip_bits:
+                if pip_bit[0] == '!':
+                    low_mask |= 1 << bit_pos.setdefault(pip_bit[1:], len(bit_pos))
+                else:
+                    high_mask |= 1 << bit_pos.setdefault(pip_bit, len(bit_pos))
+
+            self.pip_masks[src] = (high_mask, low_mask)
+
+        self.bit_order = list(bit_pos)
+        self.bit_getter = itemgetter(*self.bit_order) if len(self.bit_order) > 1 else None
+
+    def get_active_srcs(self, config_bits:dict):
+        '''
+            Finds the sources whose pip bit rules are all met by the given config bit values
+                Arguments: Dict of the tile's config bits and their values
+                Returns: List of the connected sources in pip order
+        '''
+
+        # Pack the mux's config bits which are high and which are low into separate words
+        if self.bit_getter:
+            values = self.bit_getter(config_bits)
+        else:
+            values = [config_bits[bit] for bit in self.bit_order]
+
+        high_bits = 0
+        low_bits = 0
+        for pos, value in enumerate(values):
+            if value == 1:
+                high_bits |= 1 << pos
+            elif value == 0:
+                low_bits |= 1 << pos
+
+        return [src for src, (high_mask, low_mask) in self.pip_masks.items()
+                if high_bits & high_mask == high_mask and low_bits & low_mask == low_mask]
+
+def pack_tile_addrs(addrs):
+    '''
+        Packs tile addresses into int keys of their frame and bit offsets
+            Arguments: Iterable of strings of tile addresses (<frame>_<bit>)
+            Returns: Set of ints of the packed addresses ((frame << 16) | bit)
+    '''
+
+    addr_keys = set()
+    for addr in addrs:
+        frame_addr, bit_addr = (int(addr_part) for addr_part in addr.split('_'))
+
+        # Only pack addresses in the zero-padded format used when bits are converted to tile addresses
+        if '{:02}_{:02}'.format(frame_addr, bit_addr) == addr:
+            addr_keys.add((frame_addr << 16) | bit_addr)
+
+    return frozenset(addr_keys)
+
+@lru_cache(maxsize=None)
+def get_tile_type(tile_name:str):
+    '''
+        Gets the type of a tile from its name (cached and interned, since the same tiles are
+        looked up for every fault bit)
+            Arguments: String of the tile's name
+            Returns: String of the tile's type
+    '''
+
+    return sys.intern(tile_name[:tile_name.find('_X')])
+
 def get_xray_dir():
     '''
         Gets the absolute path of the Project X-Ray database directory
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2022 Brigham Young University
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+'''
+    test_lib.py
+    BYU Configurable Computing Lab (CCL): BFAT project, 2022
+
+    Collection of pytest unit tests for BFAT library functions that can be run
+    without Vivado or a design checkpoint.
+'''
+
+import itertools
+import os
+
+# Add bfat root directory to the module import path
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.tile import RTMux
+from lib.define_bit import get_word_tiles
+
+##################################################
+#              Reference Functions               #
+##################################################
+
+def ref_active_srcs(pips:dict, config_bits:dict):
+    '''
+        Finds the connected sources of a routing mux by checking each pip bit rule in turn
+            Arguments: Dict of the mux's pips and their bit rules and dict of the config bit values
+            Returns: List of the connected sources in pip order
+    '''
+
+    connected_srcs = []
+    for src, pip_bits in pips.items():
+        connected = True
+        for pip_bit in pip_bits:
+            if pip_bit[0] == '!' and config_bits[pip_bit[1:]] != 0:
+                connected = False
+                break
+            elif pip_bit[0] != '!' and config_bits[pip_bit] != 1:
+                connected = False
+                break
+
+        if connected:
+            connected_srcs.append(src)
+
+    return connected_srcs
+
+def ref_word_tiles(bit_frame:int, word_offset:int, tilegrid:dict):
+    '''
+        Finds the tiles whose tilegrid data contains the given frame and word by scanning every
+        dataset of every tile in the tilegrid
+            Arguments: Ints of the frame address and word offset and a dict of the tilegrid
+            Returns: List of tuples of each potential tile, the index of its matching dataset, the
+                     frame's address in the tile, and the tile address of the word's first bit
+    '''
+
+    bit_tiles = {}
+    for curr_tile, info in tilegrid.items():
+        for i, baseaddr in enumerate(info['baseaddr']):
+            if bit_frame >= baseaddr and bit_frame <= baseaddr + (info['frames'][i] - 1):
+                if word_offset >= info['offset'][i] and word_offset <= info['offset'][i] + (info['words'][i] - 1):
+                    bit_tiles[curr_tile] = i
+
+    return [(curr_tile, i, bit_frame - tilegrid[curr_tile]['baseaddr'][i],
+             32 * (word_offset - tilegrid[curr_tile]['offset'][i])) for curr_tile, i in bit_tiles.items()]
+
+##################################################
+#                 Test Functions                 #
+##################################################
+
+def test_mux_active_srcs():
+    '''
+        Checks the connected sources of routing muxes against the pip bit rules for every
+        combination of their config bit values
+    '''
+
+    # 2-12 mux where every pip shares its row bit and its column bit with other pips
+    pips_2_12 = {f'SRC_{row}_{col}' : [f'ROW_{row}', f'COL_{col}'] for row in range(3) for col in range(4)}
+
+    # Muxes mixing high and low bit rules, including a pip requiring all of its bits to be low
+    pips_inv = {'SRC_A' : ['B0', '!B1'], 'SRC_B' : ['!B0', 'B1'], 'SRC_C' : ['B0', 'B1'], 'SRC_D' : ['!B0', '!B1']}
+    pips_single = {'SRC_A' : ['B0'], 'SRC_B' : ['!B0']}
+
+    for pips in [pips_2_12, pips_inv, pips_single]:
+        mux = RTMux('SINK', pips)
+        mux_bits = sorted({pip_bit.replace('!', '') for pip_bits in pips.values() for pip_bit in pip_bits})
+
+        for values in itertools.product([0, 1], repeat=len(mux_bits)):
+            config_bits = dict(zip(mux_bits, values))
+            assert mux.get_active_srcs(config_bits) == ref_active_srcs(pips, config_bits)
+
+def test_word_tiles():
+    '''
+        Checks the tiles found for frames and words against a scan of the whole tilegrid,
+        including frames and words at the edges of each tile's ranges
+    '''
+
+    tilegrid = {
+        # Tiles in the same column sharing a base address with adjacent word ranges
+        'CLBLL_L_X2Y0' : {'baseaddr' : [0x400], 'frames' : [36], 'offset' : [0], 'words' : [2]},
+        'CLBLL_L_X2Y1' : {'baseaddr' : [0x400], 'frames' : [36], 'offset' : [2], 'words' : [2]},
+        # Tile with overlapping frame and word ranges from another base address
+        'INT_L_X2Y0' : {'baseaddr' : [0x410], 'frames' : [28], 'offset' : [1], 'words' : [2]},
+        # Tile with multiple datasets, where more than one can match the same frame and word
+        'BRAM_L_X6Y0' : {'baseaddr' : [0x800000, 0x480], 'frames' : [128, 28], 'offset' : [0, 0], 'words' : [10, 10]},
+        'BRAM_L_X6Y5' : {'baseaddr' : [0x800000, 0x480, 0x490], 'frames' : [128, 28, 4], 'offset' : [10, 10, 12], 'words' : [10, 10, 1]},
+        # Single frame, single word tile
+        'CFG_CENTER_X0Y0' : {'baseaddr' : [0x500], 'frames' : [1], 'offset' : [50], 'words' : [1]},
+    }
+
+    # Check every frame and word from just before to just after the ranges of every dataset
+    frames = set()
+    words = set()
+    for info in tilegrid.values():
+        for baseaddr, frame_cnt, offset, word_cnt in zip(info['baseaddr'], info['frames'], info['offset'], info['words']):
+            frames.update((baseaddr - 1, baseaddr, baseaddr + frame_cnt // 2, baseaddr + frame_cnt - 1, baseaddr + frame_cnt))
+            words.update((offset - 1, offset, offset + word_cnt - 1, offset + word_cnt))
+
+    for bit_frame, word_offset in itertools.product(sorted(frames), sorted(words)):
+        expected = ref_word_tiles(bit_frame, word_offset, tilegrid)
+        assert get_word_tiles(bit_frame, word_offset, tilegrid) == expected
+
+        # Check that the saved tiles are returned for the word's later bits
+        assert get_word_tiles(bit_frame, word_offset, tilegrid) == expected